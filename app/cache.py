@@ -0,0 +1,230 @@
+"""
+Redis cache for GitHub responses and aggregate results.
+
+Caching is enabled by setting REDIS_URL. When it is not set, or Redis is
+unreachable, every helper degrades to a cache miss so requests still go
+straight to GitHub.
+"""
+import asyncio
+import os
+import logging
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+import orjson
+import redis.asyncio as redis
+
+from app.models import normalize_name
+
+logger = logging.getLogger(__name__)
+
+# Seconds a GitHub response stays in the cache
+GITHUB_CACHE_TTL = int(os.getenv("GITHUB_CACHE_TTL", "300"))
+
+# Seconds an /aggregate result stays in the cache
+AGGREGATE_CACHE_TTL = int(os.getenv("AGGREGATE_CACHE_TTL", "60"))
+
+# Seconds an ETag and its response body are kept for conditional requests
+ETAG_CACHE_TTL = int(os.getenv("ETAG_CACHE_TTL", "3600"))
+
+# Seconds a recompute lock is held before it expires on its own
+LOCK_TTL = 10
+
+_redis_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Return the shared Redis client, or None if caching is disabled"""
+    global _redis_client
+    if _redis_client is None:
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url:
+            _redis_client = redis.from_url(redis_url)
+    return _redis_client
+
+
+def repo_metrics_key(owner: str, repo: str) -> str:
+    """Cache key for the GitHub metrics of a repository"""
+    return f"gh:repo:{normalize_name(owner)}:{normalize_name(repo)}"
+
+
+def repo_etag_key(owner: str, repo: str) -> str:
+    """Cache key for the ETag and body of a repository's GitHub metadata"""
+    return f"gh:etag:{normalize_name(owner)}:{normalize_name(repo)}"
+
+
+def page_etag_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Cache key for the ETag and body of a paginated GitHub API response"""
+    return f"gh:etag:page:{url}?{urlencode(sorted((params or {}).items()))}"
+
+
+def aggregate_key(owner: Optional[str], language: Optional[str]) -> str:
+    """Cache key for an /aggregate result with the given filters"""
+    owner_part = normalize_name(owner) if owner else "*"
+    language_part = language.strip() if language else "*"
+    return f"agg:{owner_part}:{language_part}"
+
+
+async def get_json(key: str) -> Optional[Any]:
+    """
+    Read a JSON value from the cache
+    
+    Args:
+        key: Cache key
+        
+    Returns:
+        The decoded value, or None on a miss or cache error
+    """
+    client = get_redis()
+    if client is None:
+        return None
+    
+    try:
+        cached = await client.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {str(e)}")
+        return None
+    
+    return orjson.loads(cached) if cached is not None else None
+
+
+async def set_json(key: str, value: Any, ttl: int = GITHUB_CACHE_TTL) -> None:
+    """
+    Store a JSON value in the cache with an expiry
+    
+    Args:
+        key: Cache key
+        value: JSON-serializable value
+        ttl: Time to live in seconds
+    """
+    client = get_redis()
+    if client is None:
+        return
+    
+    try:
+        await client.setex(key, ttl, orjson.dumps(value))
+    except redis.RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+
+async def delete(*keys: str) -> None:
+    """Remove keys from the cache"""
+    client = get_redis()
+    if client is None or not keys:
+        return
+    
+    try:
+        await client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Cache delete failed: {str(e)}")
+
+
+async def get_etag(key: str) -> Optional[Tuple[str, bytes, Optional[str]]]:
+    """
+    Read a stored ETag and the response body it validates
+    
+    Returns:
+        Tuple of (etag, body, Link header or None), or None on a miss or cache error
+    """
+    client = get_redis()
+    if client is None:
+        return None
+    
+    try:
+        cached = await client.hgetall(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {str(e)}")
+        return None
+    
+    if not cached or b"etag" not in cached or b"body" not in cached:
+        return None
+    link = cached.get(b"link")
+    return cached[b"etag"].decode(), cached[b"body"], link.decode() if link else None
+
+
+async def set_etag(
+    key: str,
+    etag: str,
+    body: bytes,
+    link: Optional[str] = None,
+    ttl: int = ETAG_CACHE_TTL
+) -> None:
+    """Store an ETag together with the response body (and Link header) it validates"""
+    client = get_redis()
+    if client is None:
+        return
+    
+    mapping = {"etag": etag, "body": body}
+    if link:
+        mapping["link"] = link
+    
+    try:
+        await client.hset(key, mapping=mapping)
+        await client.expire(key, ttl)
+    except redis.RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+
+async def touch(key: str, ttl: int = ETAG_CACHE_TTL) -> None:
+    """Extend the expiry of a key that was just revalidated"""
+    client = get_redis()
+    if client is None:
+        return
+    
+    try:
+        await client.expire(key, ttl)
+    except redis.RedisError as e:
+        logger.warning(f"Cache expire failed for {key}: {str(e)}")
+
+
+async def invalidate_aggregates() -> None:
+    """Remove every cached /aggregate result after the repositories table changes"""
+    client = get_redis()
+    if client is None:
+        return
+    
+    try:
+        keys = [key async for key in client.scan_iter(match="agg:*")]
+        if keys:
+            await client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Cache invalidation failed: {str(e)}")
+
+
+async def acquire_lock(key: str) -> bool:
+    """
+    Try to take the recompute lock for a key (SET NX EX)
+    
+    Returns:
+        True if this caller should recompute the value; also True when caching
+        is disabled or Redis is unavailable, so callers never block on it
+    """
+    client = get_redis()
+    if client is None:
+        return True
+    
+    try:
+        return bool(await client.set(f"lock:{key}", b"1", nx=True, ex=LOCK_TTL))
+    except redis.RedisError as e:
+        logger.warning(f"Cache lock failed for {key}: {str(e)}")
+        return True
+
+
+async def release_lock(key: str) -> None:
+    """Release a lock taken with acquire_lock"""
+    await delete(f"lock:{key}")
+
+
+async def wait_for_json(key: str, timeout: float = 1.0, interval: float = 0.05) -> Optional[Any]:
+    """
+    Poll for a value another worker is recomputing
+    
+    Returns:
+        The cached value, or None if it did not appear within the timeout
+    """
+    for _ in range(int(timeout / interval)):
+        await asyncio.sleep(interval)
+        cached = await get_json(key)
+        if cached is not None:
+            return cached
+    return None
@@ -0,0 +1,173 @@
+"""
+Database write helpers shared by the routers.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, literal_column, or_, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import Repository
+
+# Columns identifying a repository; the target of ON CONFLICT
+REPOSITORY_KEY = ("owner", "repo")
+
+
+# insert() constructs supporting ON CONFLICT, by dialect name
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def _dialect_insert(db: Session):
+    """Return the dialect-specific insert() construct supporting ON CONFLICT, or None"""
+    return UPSERT_INSERTS.get(db.get_bind().dialect.name)
+
+
+def _upsert_statement(db: Session, rows: List[Dict[str, Any]], update_columns: Iterable[str]):
+    """Build INSERT ... ON CONFLICT (owner, repo) DO UPDATE for rows sharing the same columns"""
+    stmt = _dialect_insert(db)(Repository).values(rows)
+    set_ = {column: stmt.excluded[column] for column in update_columns}
+    # ON CONFLICT DO UPDATE does not apply Column.onupdate, so refresh it here
+    set_["timestamp"] = func.now()
+    return stmt.on_conflict_do_update(index_elements=list(REPOSITORY_KEY), set_=set_)
+
+
+def _is_postgresql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _key_filter(rows: List[Dict[str, Any]]):
+    """Match any of the rows' (owner, repo) keys without relying on tuple IN support"""
+    return or_(*(and_(Repository.owner == row["owner"], Repository.repo == row["repo"]) for row in rows))
+
+
+def _select_then_write(
+    db: Session,
+    rows: List[Dict[str, Any]],
+    update_columns: Optional[Iterable[str]] = None
+) -> Tuple[List[Repository], int]:
+    """
+    Portable upsert for dialects without ON CONFLICT: update rows that exist, add the rest
+    
+    Not atomic; a concurrent insert of the same repository surfaces as an
+    IntegrityError from the unique (owner, repo) index.
+    
+    Args:
+        db: Database session
+        rows: Column values, each including lowercase owner and repo
+        update_columns: Columns to overwrite on existing rows (defaults to
+            every non-key column in the row)
+    
+    Returns:
+        Tuple of the stored repositories (in row order) and how many were created
+    """
+    existing = {
+        (repository.owner, repository.repo): repository
+        for repository in db.query(Repository).filter(_key_filter(rows))
+    }
+    stored, created = [], 0
+    for row in rows:
+        repository = existing.get((row["owner"], row["repo"]))
+        if repository is None:
+            repository = Repository(**row)
+            db.add(repository)
+            existing[(row["owner"], row["repo"])] = repository
+            created += 1
+        else:
+            for column in update_columns if update_columns is not None else row:
+                if column not in REPOSITORY_KEY:
+                    setattr(repository, column, row[column])
+        stored.append(repository)
+    db.flush()
+    return stored, created
+
+
+def upsert_repository(
+    db: Session,
+    values: Dict[str, Any],
+    update_columns: Optional[Iterable[str]] = None
+) -> Tuple[Repository, bool]:
+    """
+    Insert a repository or update the existing row in a single statement
+    
+    Args:
+        db: Database session
+        values: Column values, including lowercase owner and repo
+        update_columns: Columns to overwrite when the repository already exists
+            (defaults to every non-key column in values)
+            
+    Returns:
+        Tuple of the stored Repository and whether it was newly created
+    """
+    if update_columns is None:
+        update_columns = [column for column in values if column not in REPOSITORY_KEY]
+    
+    if _dialect_insert(db) is None:
+        stored, created = _select_then_write(db, [values], update_columns)
+        return stored[0], bool(created)
+    
+    stmt = _upsert_statement(db, [values], update_columns)
+    
+    if _is_postgresql(db):
+        # xmax is 0 only for rows created by this statement
+        stmt = stmt.returning(Repository, literal_column("(xmax = 0)").label("created"))
+        repository, created = db.execute(stmt, execution_options={"populate_existing": True}).one()
+        return repository, created
+    
+    # Other dialects cannot tell an insert from an update in RETURNING, so check the key first
+    created = db.query(Repository.id).filter(
+        Repository.owner == values["owner"],
+        Repository.repo == values["repo"]
+    ).first() is None
+    repository = db.scalars(
+        stmt.returning(Repository),
+        execution_options={"populate_existing": True}
+    ).one()
+    return repository, created
+
+
+def upsert_repositories(db: Session, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Insert or update many repositories with one statement per column set
+    
+    Every non-key column present in a row is overwritten on conflict. Rows are
+    grouped by their columns since a multi-row VALUES needs the same columns.
+    
+    Args:
+        db: Database session
+        rows: Column values, each including lowercase owner and repo
+        
+    Returns:
+        Tuple of (inserted count, updated count)
+    """
+    if not rows:
+        return 0, 0
+    
+    if _dialect_insert(db) is None:
+        _, inserted = _select_then_write(db, rows)
+        return inserted, len(rows) - inserted
+    
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    
+    if _is_postgresql(db):
+        inserted = 0
+        for columns, group in groups.items():
+            update_columns = [column for column in columns if column not in REPOSITORY_KEY]
+            stmt = _upsert_statement(db, group, update_columns).returning(
+                literal_column("(xmax = 0)").label("inserted")
+            )
+            inserted += sum(1 for row in db.execute(stmt) if row.inserted)
+        return inserted, len(rows) - inserted
+    
+    # Other dialects cannot report inserts in RETURNING, so count existing keys first
+    existing = db.query(func.count(Repository.id)).filter(
+        tuple_(Repository.owner, Repository.repo).in_([(row["owner"], row["repo"]) for row in rows])
+    ).scalar()
+    for columns, group in groups.items():
+        update_columns = [column for column in columns if column not in REPOSITORY_KEY]
+        db.execute(_upsert_statement(db, group, update_columns))
+    return len(rows) - existing, existing
@@ -1,14 +1,41 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+import logging
 import os
+import time
+
+logger = logging.getLogger(__name__)
 
 # SQLite database URL
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./github_metrics.db")
 
+# Statements slower than this (in milliseconds) are logged
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+
+database_url = make_url(SQLALCHEMY_DATABASE_URL)
+
+connect_args = {}
+pool_args = {}
+if database_url.get_backend_name() == "sqlite":
+    connect_args["check_same_thread"] = False  # Needed for SQLite
+else:
+    # Sizing is for the QueuePool of server databases; SQLite in-memory URLs
+    # get a SingletonThreadPool, which rejects these arguments
+    pool_args = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": 30,
+    }
+
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    database_url,
+    connect_args=connect_args,
+    echo=False,
+    pool_pre_ping=True,  # Detect stale connections before handing them out
+    pool_recycle=1800,
+    **pool_args
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -16,6 +43,38 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+@event.listens_for(engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+    if elapsed_ms > SLOW_QUERY_THRESHOLD_MS:
+        logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {statement}")
+
+
+# Incremented whenever this process commits, so in-process caches of query
+# results can include it in their keys
+_data_version = 0
+
+
+def data_version() -> int:
+    """Current in-process data version; changes after every committed session"""
+    return _data_version
+
+
+def _bump_data_version(*args) -> None:
+    global _data_version
+    _data_version += 1
+
+
+# Bump only once the rows are visible to other sessions: bumping at flush time
+# would let a concurrent request cache the pre-commit rows under the new version
+event.listen(Session, "after_commit", _bump_data_version)
+
+
 def get_db():
     """Dependency to get database session"""
     db = SessionLocal()
@@ -23,5 +82,3 @@ def get_db():
         yield db
     finally:
         db.close()
-
-
@@ -1,8 +1,12 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 import logging
+import os
 from app.database import engine, Base
 from app.routers import fetch, repos, aggregate, owner, github_details
+from app.services.github_client import github_client
 
 # Configure logging
 logging.basicConfig(
@@ -13,13 +17,25 @@ logging.basicConfig(
 # Load environment variables from .env file
 load_dotenv()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables once at startup rather than at import time.
+    # Multi-worker deployments can set RUN_MIGRATIONS=0 and create the schema
+    # in a one-off job instead, so worker boot does no DDL.
+    if os.getenv("RUN_MIGRATIONS", "1") == "1":
+        Base.metadata.create_all(bind=engine)
+    yield
+    # Release pooled GitHub connections on shutdown
+    await github_client.close()
+
 
 app = FastAPI(
     title="GitHub Metrics Service",
     description="A service to fetch, store, and aggregate GitHub repository metrics",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # Faster JSON encoding for list endpoints
 )
 
 # Include routers
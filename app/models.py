@@ -1,17 +1,22 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
 
 class Repository(Base):
     __tablename__ = "repositories"
+    __table_args__ = (
+        # One row per repository; also serves (owner, repo) lookups and upserts
+        Index("uq_repo_owner_repo", "owner", "repo", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    owner = Column(String, index=True, nullable=False)
-    repo = Column(String, index=True, nullable=False)
+    # No single-column index: uq_repo_owner_repo leads with owner, and filters use lower(owner)
+    owner = Column(String, nullable=False)
+    repo = Column(String, nullable=False)
     stars = Column(Integer, default=0)
     issues = Column(Integer, default=0)  # Open issues (for backward compatibility)
-    language = Column(String, nullable=True)
+    language = Column(String, index=True, nullable=True)
     # Detailed issue and PR counts
     issues_open = Column(Integer, default=0)
     issues_closed = Column(Integer, default=0)
@@ -20,3 +25,11 @@ class Repository(Base):
     timestamp = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
+# Case-insensitive owner lookups filter on lower(owner); leading with it lets this
+# index serve both owner-only and combined owner + language filters
+Index("ix_repo_owner_lower_language", func.lower(Repository.owner), Repository.language)
+
+
+def normalize_name(value: str) -> str:
+    """Canonical form of an owner or repository name as stored in the database"""
+    return value.strip().lower()
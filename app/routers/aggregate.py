@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import Optional
-from collections import defaultdict
+from app import cache
 from app.database import get_db
-from app.models import Repository
+from app.models import Repository, normalize_name
 from app.schemas import AggregationResponse
 
 router = APIRouter()
@@ -27,32 +30,54 @@ async def aggregate_metrics(
     - **owner**: Filter repositories by owner before aggregation
     - **language**: Filter repositories by programming language before aggregation
     """
-    query = db.query(Repository)
+    cache_key = cache.aggregate_key(owner, language)
+    cached = await cache.get_json(cache_key)
+    if cached is not None:
+        return ORJSONResponse(content=cached)
     
-    # Apply filters
+    # Only one worker recomputes a missing result; others wait for it briefly
+    locked = await cache.acquire_lock(cache_key)
+    try:
+        if not locked:
+            cached = await cache.wait_for_json(cache_key)
+            if cached is not None:
+                return ORJSONResponse(content=cached)
+        
+        response = await run_in_threadpool(compute_aggregates, db, owner, language)
+        await cache.set_json(cache_key, response.model_dump(), cache.AGGREGATE_CACHE_TTL)
+        return response
+    finally:
+        if locked:
+            await cache.release_lock(cache_key)
+
+
+def compute_aggregates(db: Session, owner: Optional[str], language: Optional[str]) -> AggregationResponse:
+    """Run the aggregation queries for the given filters (blocking; run in the threadpool)"""
+    # Build the filter list once so totals and the breakdown see the same rows
+    filters = []
     if owner:
-        query = query.filter(Repository.owner == owner.lower().strip())
+        filters.append(func.lower(Repository.owner) == normalize_name(owner))
     
     if language:
-        query = query.filter(Repository.language == language.strip())
+        filters.append(Repository.language == language.strip())
     
-    repos = query.all()
-    
-    # Calculate aggregations
-    total_stars = sum(repo.stars for repo in repos)
-    total_issues = sum(repo.issues for repo in repos)
-    repo_count = len(repos)
+    # Let the database do the summing instead of loading every row
+    total_stars, total_issues, repo_count = db.query(
+        func.coalesce(func.sum(Repository.stars), 0),
+        func.coalesce(func.sum(Repository.issues), 0),
+        func.count(Repository.id)
+    ).filter(*filters).one()
     
     # Group by language
-    by_language = defaultdict(int)
-    for repo in repos:
-        lang = repo.language or "Unknown"
-        by_language[lang] += 1
+    language_key = func.coalesce(Repository.language, "Unknown")
+    language_rows = db.query(
+        language_key,
+        func.count(Repository.id)
+    ).filter(*filters).group_by(language_key).all()
     
     return AggregationResponse(
         total_stars=total_stars,
         total_issues=total_issues,
         repo_count=repo_count,
-        by_language=dict(by_language)
+        by_language={lang: count for lang, count in language_rows}
     )
-
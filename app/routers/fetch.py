@@ -1,15 +1,115 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Tuple
 from app.database import get_db
-from app.models import Repository
-from app.schemas import FetchResponse, RepositoryResponse, ErrorResponse
-from app.services.github_client import GitHubClient
+from app.models import normalize_name
+from app.schemas import FetchResponse, RepositoryResponse, ErrorResponse, BatchFetchRequest, BatchFetchResponse
+from app.services.github_client import github_client
+from app import cache, crud
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-github_client = GitHubClient()
+
+
+def store_repository(db: Session, values: Dict[str, Any], update_columns: List[str]) -> Tuple[RepositoryResponse, bool]:
+    """
+    Upsert a repository and commit (blocking; run in the threadpool)
+    
+    Returns:
+        Tuple of the stored repository and whether it was newly created
+    """
+    db_repo, created = crud.upsert_repository(db, values, update_columns)
+    data = RepositoryResponse.from_orm_fast(db_repo)
+    db.commit()
+    return data, created
+
+
+def store_repositories(db: Session, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Upsert many repositories and commit (blocking; run in the threadpool)
+    
+    Returns:
+        Tuple of (inserted count, updated count)
+    """
+    counts = crud.upsert_repositories(db, rows)
+    db.commit()
+    return counts
+
+
+@router.post("/batch", response_model=BatchFetchResponse)
+async def fetch_repositories_batch(
+    request: BatchFetchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Fetch metrics for many repositories from GitHub and store them in database
+    
+    Repositories are queried in batches with one GraphQL request each (when a
+    GitHub token is configured) instead of one request per repository.
+    
+    - **repos**: List of {"owner": ..., "repo": ...} objects (1-500)
+    
+    Returns counts of stored and updated repositories and those not found on GitHub.
+    """
+    # Deduplicate case-insensitively, keeping the first spelling for the GitHub API
+    pairs: Dict[Tuple[str, str], Tuple[str, str]] = {}
+    for ref in request.repos:
+        owner_clean = ref.owner.strip()
+        repo_clean = ref.repo.strip()
+        if not owner_clean or not repo_clean:
+            raise HTTPException(status_code=400, detail="Owner and repo cannot be empty")
+        pairs.setdefault((normalize_name(owner_clean), normalize_name(repo_clean)), (owner_clean, repo_clean))
+    
+    try:
+        results = await github_client.fetch_metrics_batch(list(pairs.values()))
+        
+        rows = []
+        not_found = []
+        for (owner_lower, repo_lower), (owner_clean, repo_clean), metrics in zip(pairs, pairs.values(), results):
+            if metrics is None:
+                not_found.append(f"{owner_clean}/{repo_clean}")
+                continue
+            
+            await cache.set_json(cache.repo_metrics_key(owner_clean, repo_clean), metrics)
+            rows.append({
+                "owner": owner_lower,
+                "repo": repo_lower,
+                "stars": metrics["stars"],
+                "issues": metrics["issues"],
+                "language": metrics["language"],
+                "issues_open": metrics.get("issues_open", metrics["issues"]),
+                "issues_closed": metrics.get("issues_closed", 0),
+                "prs_open": metrics.get("prs_open", 0),
+                "prs_closed": metrics.get("prs_closed", 0)
+            })
+        
+        stored_count = 0
+        updated_count = 0
+        if rows:
+            stored_count, updated_count = await run_in_threadpool(store_repositories, db, rows)
+            await cache.invalidate_aggregates()
+        
+        return BatchFetchResponse(
+            success=True,
+            message=f"Fetched {len(rows)} of {len(pairs)} repositories",
+            stored=stored_count,
+            updated=updated_count,
+            not_found=not_found
+        )
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions (already properly formatted)
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching repository batch: {str(e)}")
+        await run_in_threadpool(db.rollback)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
 
 
 @router.post("/{owner}/{repo}", response_model=FetchResponse)
@@ -38,68 +138,53 @@ async def fetch_repository(
     repo_clean = repo.strip()
     
     # Use lowercase for database storage/comparison (case-insensitive lookup)
-    owner_lower = owner_clean.lower()
-    repo_lower = repo_clean.lower()
+    owner_lower = normalize_name(owner_clean)
+    repo_lower = normalize_name(repo_clean)
     
     try:
         # Fetch metrics from GitHub (use original case - GitHub is case-sensitive)
         # Include detailed issue/PR counts
-        metrics = await github_client.fetch_repository_metrics(owner_clean, repo_clean, include_detailed=True)
+        cache_key = cache.repo_metrics_key(owner_clean, repo_clean)
+        metrics = await cache.get_json(cache_key)
+        if metrics is None:
+            metrics = await github_client.fetch_repository_metrics(owner_clean, repo_clean, include_detailed=True)
+            await cache.set_json(cache_key, metrics)
         
-        # Check if repository already exists in database (case-insensitive lookup)
-        existing_repo = db.query(Repository).filter(
-            Repository.owner == owner_lower,
-            Repository.repo == repo_lower
-        ).first()
+        # Store lowercase for case-insensitive queries
+        values = {
+            "owner": owner_lower,
+            "repo": repo_lower,
+            "stars": metrics["stars"],
+            "issues": metrics["issues"],
+            "language": metrics["language"],
+            "issues_open": metrics.get("issues_open", metrics["issues"]),
+            "issues_closed": metrics.get("issues_closed", 0),
+            "prs_open": metrics.get("prs_open", 0),
+            "prs_closed": metrics.get("prs_closed", 0)
+        }
         
-        if existing_repo:
-            # Update existing record
-            existing_repo.stars = metrics["stars"]
-            existing_repo.issues = metrics["issues"]
-            existing_repo.language = metrics["language"]
-            # Update detailed counts if available
-            if "issues_open" in metrics:
-                existing_repo.issues_open = metrics.get("issues_open", 0)
-                existing_repo.issues_closed = metrics.get("issues_closed", 0)
-                existing_repo.prs_open = metrics.get("prs_open", 0)
-                existing_repo.prs_closed = metrics.get("prs_closed", 0)
-            db.commit()
-            db.refresh(existing_repo)
-            
-            return FetchResponse(
-                success=True,
-                message=f"Repository '{owner_clean}/{repo_clean}' updated successfully",
-                data=RepositoryResponse.model_validate(existing_repo)
-            )
+        # Only overwrite stored detailed counts if they were fetched
+        update_columns = ["stars", "issues", "language"]
+        if "issues_open" in metrics:
+            update_columns += ["issues_open", "issues_closed", "prs_open", "prs_closed"]
+        
+        # Run the blocking database work off the event loop
+        data, created = await run_in_threadpool(store_repository, db, values, update_columns)
+        await cache.invalidate_aggregates()
+        
+        if created:
+            message = f"Repository '{owner_clean}/{repo_clean}' fetched and stored successfully"
         else:
-            # Create new record (store lowercase for case-insensitive queries)
-            db_repo = Repository(
-                owner=owner_lower,
-                repo=repo_lower,
-                stars=metrics["stars"],
-                issues=metrics["issues"],
-                language=metrics["language"],
-                issues_open=metrics.get("issues_open", metrics["issues"]),
-                issues_closed=metrics.get("issues_closed", 0),
-                prs_open=metrics.get("prs_open", 0),
-                prs_closed=metrics.get("prs_closed", 0)
-            )
-            db.add(db_repo)
-            db.commit()
-            db.refresh(db_repo)
-            
-            return FetchResponse(
-                success=True,
-                message=f"Repository '{owner_clean}/{repo_clean}' fetched and stored successfully",
-                data=RepositoryResponse.model_validate(db_repo)
-            )
+            message = f"Repository '{owner_clean}/{repo_clean}' updated successfully"
+        
+        return FetchResponse(success=True, message=message, data=data)
             
     except HTTPException:
         # Re-raise HTTP exceptions (already properly formatted)
         raise
     except Exception as e:
         logger.error(f"Error fetching repository {owner_clean}/{repo_clean}: {str(e)}")
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.database import get_db
-from app.models import Repository
-from app.services.github_client import GitHubClient
+from app.models import normalize_name
+from app.services.github_client import github_client
+from app import cache, crud
 from app.schemas import RepositoryResponse
 from pydantic import BaseModel
 from typing import Dict, Any
@@ -12,7 +14,12 @@ import logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-github_client = GitHubClient()
+
+
+def store_repository(db: Session, values: Dict[str, Any]) -> None:
+    """Upsert a repository and commit (blocking; run in the threadpool)"""
+    crud.upsert_repository(db, values)
+    db.commit()
 
 
 class GitHubDetailsResponse(BaseModel):
@@ -62,7 +69,11 @@ async def get_github_repository_details(
     
     try:
         # Fetch detailed metrics from GitHub
-        metrics = await github_client.fetch_repository_metrics(owner_clean, repo_clean, include_detailed=True)
+        cache_key = cache.repo_metrics_key(owner_clean, repo_clean)
+        metrics = await cache.get_json(cache_key)
+        if metrics is None:
+            metrics = await github_client.fetch_repository_metrics(owner_clean, repo_clean, include_detailed=True)
+            await cache.set_json(cache_key, metrics)
         
         # Extract detailed counts
         issues_open = metrics.get("issues_open", 0)
@@ -85,41 +96,25 @@ async def get_github_repository_details(
         
         # Store in database if requested
         if store:
-            owner_lower = owner_clean.lower()
-            repo_lower = repo_clean.lower()
+            owner_lower = normalize_name(owner_clean)
+            repo_lower = normalize_name(repo_clean)
             
             try:
-                existing_repo = db.query(Repository).filter(
-                    Repository.owner == owner_lower,
-                    Repository.repo == repo_lower
-                ).first()
-                
-                if existing_repo:
-                    existing_repo.stars = metrics["stars"]
-                    existing_repo.issues = metrics["issues"]
-                    existing_repo.language = metrics["language"]
-                    existing_repo.issues_open = issues_open
-                    existing_repo.issues_closed = issues_closed
-                    existing_repo.prs_open = prs_open
-                    existing_repo.prs_closed = prs_closed
-                else:
-                    db_repo = Repository(
-                        owner=owner_lower,
-                        repo=repo_lower,
-                        stars=metrics["stars"],
-                        issues=metrics["issues"],
-                        language=metrics["language"],
-                        issues_open=issues_open,
-                        issues_closed=issues_closed,
-                        prs_open=prs_open,
-                        prs_closed=prs_closed
-                    )
-                    db.add(db_repo)
-                
-                db.commit()
+                await run_in_threadpool(store_repository, db, {
+                    "owner": owner_lower,
+                    "repo": repo_lower,
+                    "stars": metrics["stars"],
+                    "issues": metrics["issues"],
+                    "language": metrics["language"],
+                    "issues_open": issues_open,
+                    "issues_closed": issues_closed,
+                    "prs_open": prs_open,
+                    "prs_closed": prs_closed
+                })
+                await cache.invalidate_aggregates()
                 logger.info(f"Stored detailed metrics for {owner_clean}/{repo_clean} in database")
             except Exception as e:
-                db.rollback()
+                await run_in_threadpool(db.rollback)
                 logger.error(f"Error storing repository in database: {str(e)}")
                 raise HTTPException(
                     status_code=500,
@@ -1,16 +1,99 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Dict, Any, List, Tuple
 from app.database import get_db
-from app.models import Repository
+from app.models import normalize_name
 from app.schemas import OwnerReposResponse, GitHubRepoInfo
-from app.services.github_client import GitHubClient
+from app.services.github_client import github_client
+from app import cache, crud
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-github_client = GitHubClient()
+
+# Validates the GitHub repository list in one compiled pass
+REPO_INFO_LIST_ADAPTER = TypeAdapter(List[GitHubRepoInfo])
+
+DETAIL_CONCURRENCY = 5  # Concurrent per-repository detail fetches
+DETAIL_MAX_RETRIES = 3  # Retries for repositories hit by a secondary rate limit
+
+
+async def fetch_detailed_metrics(owner: str, repo_names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch detailed issue/PR counts for many repositories concurrently
+    
+    Repositories rejected with a 403 (secondary rate limit) are retried one at a
+    time with exponential backoff; other failures are logged and skipped.
+    
+    Args:
+        owner: GitHub username or organization name
+        repo_names: Repository names as returned by GitHub
+        
+    Returns:
+        Dictionary mapping lowercase repository name to its metrics
+    """
+    semaphore = asyncio.Semaphore(DETAIL_CONCURRENCY)
+    
+    async def fetch_one(repo_name: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await github_client.fetch_repository_metrics(owner, repo_name, include_detailed=True)
+    
+    results = await asyncio.gather(*(fetch_one(name) for name in repo_names), return_exceptions=True)
+    
+    detailed = {}
+    rate_limited = []
+    for repo_name, result in zip(repo_names, results):
+        if isinstance(result, HTTPException) and result.status_code == 403:
+            rate_limited.append(repo_name)
+        elif isinstance(result, Exception):
+            logger.warning(f"Error fetching detailed metrics for {owner}/{repo_name}: {str(result)}")
+        else:
+            detailed[normalize_name(repo_name)] = result
+    
+    # Back off to sequential requests for anything that hit the rate limit
+    for repo_name in rate_limited:
+        for attempt in range(DETAIL_MAX_RETRIES):
+            await asyncio.sleep(2 ** attempt)
+            try:
+                detailed[normalize_name(repo_name)] = await github_client.fetch_repository_metrics(
+                    owner, repo_name, include_detailed=True
+                )
+                break
+            except HTTPException as e:
+                if e.status_code != 403:
+                    logger.warning(f"Error fetching detailed metrics for {owner}/{repo_name}: {e.detail}")
+                    break
+        else:
+            logger.warning(f"Giving up on detailed metrics for {owner}/{repo_name} after {DETAIL_MAX_RETRIES} retries")
+    
+    return detailed
+
+
+def store_repositories(db: Session, owner_lower: str, rows: Dict[str, Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Upsert repositories for an owner, then commit
+    
+    Blocking; run in the threadpool.
+    
+    Args:
+        db: Database session
+        owner_lower: Lowercase owner name
+        rows: Column values keyed by lowercase repository name
+        
+    Returns:
+        Tuple of (inserted count, updated count)
+    """
+    counts = crud.upsert_repositories(db, [
+        {"owner": owner_lower, "repo": repo_lower, **values}
+        for repo_lower, values in rows.items()
+    ])
+    db.commit()
+    return counts
 
 
 @router.get("/{owner}/repos", response_model=OwnerReposResponse)
@@ -18,6 +101,7 @@ async def get_owner_repositories(
     owner: str,
     limit: Optional[int] = Query(None, ge=1, le=1000, description="Limit number of repositories to return"),
     store: bool = Query(True, description="Store repositories in database"),
+    detailed: bool = Query(False, description="Also fetch and store detailed issue/PR counts for each repository"),
     db: Session = Depends(get_db)
 ):
     """
@@ -29,6 +113,7 @@ async def get_owner_repositories(
     - **owner**: GitHub username or organization name (e.g., "facebook", "microsoft")
     - **limit**: Optional limit on number of repositories to return (1-1000)
     - **store**: Whether to store repositories in database (default: true)
+    - **detailed**: Whether to fetch detailed issue/PR counts per repository when storing (default: false)
     
     Returns a list of all repositories owned by the specified user/organization.
     """
@@ -37,11 +122,11 @@ async def get_owner_repositories(
         raise HTTPException(status_code=400, detail="Owner cannot be empty")
     
     owner_clean = owner.strip()
-    owner_lower = owner_clean.lower()
+    owner_lower = normalize_name(owner_clean)
     
     try:
         # Fetch repositories from GitHub
-        repos_data = await github_client.get_owner_repositories(owner_clean, limit=limit)
+        repos_data = [repo async for repo in github_client.get_owner_repositories(owner_clean, limit=limit)]
         
         # Store repositories in database if requested
         stored_count = 0
@@ -50,48 +135,59 @@ async def get_owner_repositories(
         if store:
             logger.info(f"Storing {len(repos_data)} repositories for owner {owner_clean} in database")
             
+            # Fetch per-repository issue/PR breakdowns concurrently if requested
+            detailed_metrics = {}
+            if detailed:
+                detailed_metrics = await fetch_detailed_metrics(
+                    owner_clean,
+                    [repo_info.name or "" for repo_info in repos_data]
+                )
+            
+            # Build the values to store, keyed by lowercase repository name
+            rows = {}
             for repo_info in repos_data:
-                repo_name = repo_info.get("name", "")
-                repo_lower = repo_name.lower()
+                repo_lower = normalize_name(repo_info.name or "")
+                values = {
+                    "stars": repo_info.stars,
+                    "issues": repo_info.open_issues,
+                    "language": repo_info.language
+                }
                 
-                # Check if repository already exists
-                existing_repo = db.query(Repository).filter(
-                    Repository.owner == owner_lower,
-                    Repository.repo == repo_lower
-                ).first()
+                metrics = detailed_metrics.get(repo_lower)
+                if metrics:
+                    values.update({
+                        "issues": metrics["issues"],
+                        "issues_open": metrics.get("issues_open", 0),
+                        "issues_closed": metrics.get("issues_closed", 0),
+                        "prs_open": metrics.get("prs_open", 0),
+                        "prs_closed": metrics.get("prs_closed", 0)
+                    })
                 
-                if existing_repo:
-                    # Update existing record
-                    existing_repo.stars = repo_info.get("stars", 0)
-                    existing_repo.issues = repo_info.get("open_issues", 0)
-                    existing_repo.language = repo_info.get("language")
-                    updated_count += 1
-                else:
-                    # Create new record
-                    db_repo = Repository(
-                        owner=owner_lower,
-                        repo=repo_lower,
-                        stars=repo_info.get("stars", 0),
-                        issues=repo_info.get("open_issues", 0),
-                        language=repo_info.get("language")
-                    )
-                    db.add(db_repo)
-                    stored_count += 1
+                rows[repo_lower] = values
             
-            # Commit all changes
+            # Write all changes off the event loop
             try:
-                db.commit()
+                stored_count, updated_count = await run_in_threadpool(store_repositories, db, owner_lower, rows)
                 logger.info(f"Successfully stored {stored_count} new and updated {updated_count} existing repositories")
             except Exception as e:
-                db.rollback()
+                await run_in_threadpool(db.rollback)
                 logger.error(f"Error committing repositories to database: {str(e)}")
                 raise HTTPException(
                     status_code=500,
                     detail=f"Error storing repositories in database: {str(e)}"
                 )
+            
+            # Cached GitHub metrics for these repositories are now older than the database
+            await cache.delete(*(
+                cache.repo_metrics_key(owner_lower, repo_lower)
+                for repo_lower in rows
+            ))
+            for repo_lower in rows:
+                github_client.forget_metrics(owner_lower, repo_lower)
+            await cache.invalidate_aggregates()
         
         # Convert to response models
-        repos = [GitHubRepoInfo(**repo) for repo in repos_data]
+        repos = REPO_INFO_LIST_ADAPTER.validate_python(repos_data, from_attributes=True)
         
         response = OwnerReposResponse(
             owner=owner_clean,
@@ -105,14 +201,15 @@ async def get_owner_repositories(
         if store:
             logger.info(f"Fetched and stored {len(repos)} repositories for {owner_clean} (new: {stored_count}, updated: {updated_count})")
         
-        return response
+        # Already validated, so serialize directly instead of through FastAPI's encoder
+        return Response(content=response.model_dump_json(), media_type="application/json")
         
     except HTTPException:
         # Re-raise HTTP exceptions (already properly formatted)
         raise
     except Exception as e:
         logger.error(f"Error fetching repositories for owner {owner_clean}: {str(e)}")
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
@@ -1,18 +1,86 @@
+import os
+from cachetools import TTLCache
 from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from typing import Optional
-from app.database import get_db
-from app.models import Repository
-from app.schemas import RepoListResponse, RepositoryResponse
+from typing import Any, Dict, Iterator, List, Optional
+from app.database import SessionLocal, data_version, get_db
+from app.models import Repository, normalize_name
+from app.schemas import RepoListResponse, RepositoryRow
 
 router = APIRouter()
 
+# Columns needed to build a RepositoryResponse, in its field order; querying
+# these directly returns lightweight rows instead of fully hydrated ORM instances
+COLUMNS = (
+    Repository.owner,
+    Repository.repo,
+    Repository.stars,
+    Repository.issues,
+    Repository.language,
+    Repository.issues_open,
+    Repository.issues_closed,
+    Repository.prs_open,
+    Repository.prs_closed,
+    Repository.id,
+    Repository.timestamp,
+)
+
+# Serializes a whole list of row dicts in one compiled pass, without building
+# a RepositoryResponse per row
+REPO_LIST_ADAPTER = TypeAdapter(List[RepositoryRow])
+
+# Batch size used when streaming an unbounded result set from the database
+YIELD_PER = 1000
+
+# Encoded bodies of recent limited listings, off unless REPO_QUERY_CACHE_TTL is
+# set. Keys include the data version, so writes committed by this process take
+# effect at once; the TTL bounds how long writes made by other workers can go unseen.
+QUERY_CACHE_TTL = float(os.getenv("REPO_QUERY_CACHE_TTL", "0"))
+_query_cache: Optional[TTLCache] = TTLCache(maxsize=256, ttl=QUERY_CACHE_TTL) if QUERY_CACHE_TTL > 0 else None
+
+
+def stream_repositories(bind, stmt) -> Iterator[bytes]:
+    """
+    Encode a RepoListResponse body incrementally, one database batch at a time
+    
+    Keeps memory flat regardless of table size; the total is written after the
+    last batch since it is only known once the cursor is exhausted. Starlette
+    iterates this synchronous generator in its threadpool.
+    
+    The body is sent after the endpoint returns, when its get_db session may
+    already be closed, so the generator opens its own session on the same bind
+    and closes it once the body is done (or the client goes away).
+    """
+    with SessionLocal(bind=bind) as db:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=YIELD_PER))
+        
+        yield b'{"repos":['
+        total = 0
+        for partition in result.partitions():
+            # Strip the list brackets so batches join into a single JSON array
+            chunk = REPO_LIST_ADAPTER.dump_json([row._asdict() for row in partition])[1:-1]
+            yield chunk if not total else b"," + chunk
+            total += len(partition)
+        # Everything after the cursor has been sent, so there is no next page
+        yield b'],"total":%d,"next_cursor":null}' % total
+
+
+def fetch_repositories(db: Session, stmt) -> List[Dict[str, Any]]:
+    """Run a bounded listing query (blocking; run in the threadpool)"""
+    # Values come straight from the database, so skip re-validation
+    return [row._asdict() for row in db.execute(stmt)]
+
 
 @router.get("", response_model=RepoListResponse)
 async def list_repositories(
     owner: Optional[str] = Query(None, description="Filter by owner"),
     language: Optional[str] = Query(None, description="Filter by programming language"),
     limit: Optional[int] = Query(None, ge=1, le=1000, description="Limit number of results"),
+    after_id: Optional[int] = Query(None, ge=0, description="Return repositories after this id (next_cursor of the previous page)"),
     db: Session = Depends(get_db)
 ):
     """
@@ -21,24 +89,49 @@ async def list_repositories(
     - **owner**: Filter repositories by owner
     - **language**: Filter repositories by programming language
     - **limit**: Maximum number of results to return (1-1000)
+    - **after_id**: Keyset cursor; pass the previous page's `next_cursor`
+    
+    `total` counts the repositories in this response, taken from the rows
+    already fetched rather than a separate COUNT query.
     """
-    query = db.query(Repository)
+    # Keyset pagination: ordering by the primary key lets each page resume
+    # with an index range scan instead of skipping over earlier rows
+    stmt = select(*COLUMNS).order_by(Repository.id)
+    
+    if after_id is not None:
+        stmt = stmt.where(Repository.id > after_id)
     
     # Apply filters
     if owner:
-        query = query.filter(Repository.owner == owner.lower().strip())
+        stmt = stmt.where(func.lower(Repository.owner) == normalize_name(owner))
     
     if language:
-        query = query.filter(Repository.language == language.strip())
-    
-    # Apply limit
-    if limit:
-        query = query.limit(limit)
+        stmt = stmt.where(Repository.language == language.strip())
     
-    repos = query.all()
+    # Without a limit the whole table may match, so stream it instead of building a list
+    if not limit:
+        return StreamingResponse(stream_repositories(db.get_bind(), stmt), media_type="application/json")
     
-    return RepoListResponse(
-        repos=[RepositoryResponse.model_validate(repo) for repo in repos],
-        total=len(repos)
+    cache_key = (
+        normalize_name(owner) if owner else None,
+        language.strip() if language else None,
+        limit,
+        after_id,
+        data_version(),
     )
-
+    content = _query_cache.get(cache_key) if _query_cache is not None else None
+    if content is None:
+        repos = await run_in_threadpool(fetch_repositories, db, stmt.limit(limit))
+        
+        # A short page means there is nothing left to fetch
+        next_cursor = b"%d" % repos[-1]["id"] if len(repos) == limit else b"null"
+        
+        # Encode the response directly rather than through FastAPI's per-item encoder
+        content = (
+            b'{"repos":' + REPO_LIST_ADAPTER.dump_json(repos)
+            + b',"total":%d,"next_cursor":%s}' % (len(repos), next_cursor)
+        )
+        if _query_cache is not None:
+            _query_cache[cache_key] = content
+    
+    return Response(content=content, media_type="application/json")
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List
+from typing_extensions import TypedDict
 
 
 class RepositoryBase(BaseModel):
@@ -24,6 +25,37 @@ class RepositoryResponse(RepositoryBase):
     
     id: int
     timestamp: datetime
+    
+    @classmethod
+    def from_orm_fast(cls, obj: Any) -> "RepositoryResponse":
+        """
+        Build a response from a database row without running validation
+        
+        Only use for rows read from the database, whose values already satisfy
+        the schema; externally sourced data should go through model_validate.
+        """
+        return cls.model_construct(
+            id=obj.id,
+            owner=obj.owner,
+            repo=obj.repo,
+            stars=obj.stars,
+            issues=obj.issues,
+            language=obj.language,
+            issues_open=obj.issues_open,
+            issues_closed=obj.issues_closed,
+            prs_open=obj.prs_open,
+            prs_closed=obj.prs_closed,
+            timestamp=obj.timestamp
+        )
+
+
+# Plain-dict form of RepositoryResponse for serializing database rows, so list
+# endpoints can dump row mappings directly instead of building a model per row.
+# Derived from the model's fields, so the two cannot drift apart
+RepositoryRow = TypedDict(
+    "RepositoryRow",
+    {name: field.annotation for name, field in RepositoryResponse.model_fields.items()}
+)
 
 
 class FetchResponse(BaseModel):
@@ -32,9 +64,28 @@ class FetchResponse(BaseModel):
     data: Optional[RepositoryResponse] = None
 
 
+class RepoRef(BaseModel):
+    owner: str = Field(..., min_length=1, description="Repository owner")
+    repo: str = Field(..., min_length=1, description="Repository name")
+
+
+class BatchFetchRequest(BaseModel):
+    repos: List[RepoRef] = Field(..., min_length=1, max_length=500, description="Repositories to fetch")
+
+
+class BatchFetchResponse(BaseModel):
+    success: bool
+    message: str
+    stored: int = Field(..., description="Number of repositories stored in database")
+    updated: int = Field(..., description="Number of repositories updated in database")
+    not_found: List[str] = Field(default_factory=list, description="Repositories not found on GitHub")
+
+
 class RepoListResponse(BaseModel):
     repos: List[RepositoryResponse]
     total: int
+    # Pass as after_id to fetch the next page; None once the listing is exhausted
+    next_cursor: Optional[int] = None
 
 
 class AggregationResponse(BaseModel):
@@ -1,20 +1,106 @@
+import asyncio
+import math
+import random
+import re
+import time
 import httpx
-from typing import Optional, Dict, Any, List
+import orjson
+from cachetools import LRUCache, TTLCache
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Literal, Tuple, AsyncIterator, Awaitable, Callable
 from fastapi import HTTPException
 import logging
+from app import cache
+from app.models import normalize_name
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 multiplexes concurrent page requests over one connection; it needs the
+# h2 package (installed by httpx[http2]), so fall back to HTTP/1.1 without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+    logger.warning("h2 is not installed; GitHub requests will use HTTP/1.1")
+
+# Link header parsing, e.g. '<https://api.github.com/...?page=5>; rel="last"'
+LINK_LAST_RE = re.compile(r'<([^>]+)>\s*;\s*rel="last"')
+LINK_NEXT_RE = re.compile(r'rel="next"')
+PAGE_PARAM_RE = re.compile(r'[?&]page=(\d+)')
+
+# Repository payload fields read by _extract_repo_row, besides owner.login
+REPO_PAYLOAD_FIELDS = (
+    "name", "full_name", "description", "stargazers_count", "forks_count", "open_issues_count",
+    "language", "private", "fork", "created_at", "updated_at", "pushed_at", "html_url", "url"
+)
+
+# Repository metrics in one GraphQL request; totals are computed by GitHub
+METRICS_FIELDS = """
+fragment MetricsFields on Repository {
+  stargazerCount
+  primaryLanguage { name }
+  issues_open: issues(states: OPEN) { totalCount }
+  issues_closed: issues(states: CLOSED) { totalCount }
+  prs_open: pullRequests(states: OPEN) { totalCount }
+  prs_closed: pullRequests(states: [CLOSED, MERGED]) { totalCount }
+}
+"""
+METRICS_QUERY = """
+query($owner: String!, $repo: String!) {
+  repository(owner: $owner, name: $repo) { ...MetricsFields }
+}
+""" + METRICS_FIELDS
+
+
+@dataclass(slots=True)
+class RepoRow:
+    """Repository fields kept from a GitHub repository listing"""
+    name: Optional[str]
+    full_name: Optional[str]
+    owner: Optional[str]
+    description: Optional[str]
+    stars: int
+    forks: int
+    open_issues: int
+    language: Optional[str]
+    is_private: bool
+    is_fork: bool
+    created_at: Optional[str]
+    updated_at: Optional[str]
+    pushed_at: Optional[str]
+    url: Optional[str]
+    api_url: Optional[str]
+
 
 class GitHubClient:
     """Async client for GitHub API with pagination support"""
 
     BASE_URL = "https://api.github.com"
-    TIMEOUT = 30.0
+    TIMEOUT = 10.0
+    CONNECT_TIMEOUT = 5.0
+    CONNECT_RETRIES = 2  # Retries for failed connection attempts
+    MAX_CONCURRENCY = 5  # Concurrent page requests per paginated call
+    COUNT_CONCURRENCY = 16  # Concurrent page requests per count, within GitHub's secondary limits
+    SEARCH_CONCURRENCY = 30  # Search API allows 30 requests per minute when authenticated
+    ETAG_CACHE_BYTES = 32 * 1024 * 1024  # Response body bytes kept in process for conditional requests
+    GRAPHQL_BATCH_SIZE = 50  # Repositories per aliased GraphQL query, within node limits
+    METRICS_CACHE_SIZE = 10_000
+    METRICS_CACHE_TTL = 60.0  # Seconds fetched metrics are served from memory
+    MAX_CONNECTIONS = 1000  # Room for fanning out counts across many repositories at once
+    MAX_KEEPALIVE_CONNECTIONS = 100
+    KEEPALIVE_EXPIRY = 30.0  # Seconds an idle connection is kept for reuse
+    MAX_ATTEMPTS = 4  # Attempts per request for transient failures
+    MAX_BACKOFF = 30.0  # Upper bound on a single retry delay, in seconds
+    MAX_RATE_LIMIT_WAIT = 60.0  # Longest wait for a rate limit reset before giving up
+    RETRY_STATUSES = frozenset({502, 503, 504})
+    RATE_GATE_CONCURRENCY = 64  # Requests in flight across the client
+    LOW_RATE_BUDGET = 0.1  # Fraction of the rate limit below which requests are paced
 
     def __init__(self):
         import os
-        headers = {
+        self.headers = {
             "Accept": "application/vnd.github.v3+json",
             "User-Agent": "GitHub-Metrics-Service"
         }
@@ -22,17 +108,287 @@ class GitHubClient:
         # Add GitHub token if available (increases rate limits)
         github_token = os.getenv("GITHUB_TOKEN")
         if github_token:
-            headers["Authorization"] = f"token {github_token}"
+            self.headers["Authorization"] = f"token {github_token}"
         
-        self.client = httpx.AsyncClient(
+        self._client = self._build_client()
+        self._search_semaphore = asyncio.Semaphore(self.SEARCH_CONCURRENCY)
+        # (url, params) -> (etag, body, headers) of the last 200 response, bounded by body size
+        self._etag_cache: LRUCache = LRUCache(maxsize=self.ETAG_CACHE_BYTES, getsizeof=lambda entry: len(entry[1]))
+        # Metric fetches in progress, shared by concurrent identical requests
+        self._inflight: Dict[Tuple[str, str, bool], asyncio.Task] = {}
+        # (normalized owner, normalized repo, include_detailed) -> (fetched at, metrics)
+        self._metrics_cache: TTLCache = TTLCache(maxsize=self.METRICS_CACHE_SIZE, ttl=self.METRICS_CACHE_TTL)
+        # Last seen rate limit per resource ("core", "search"): (remaining, limit, reset epoch)
+        self._rate_limits: Dict[str, Tuple[int, int, float]] = {}
+        self._next_request_at: Dict[str, float] = {}
+        self._rate_semaphore = asyncio.Semaphore(self.RATE_GATE_CONCURRENCY)
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Create the pooled (HTTP/2 when available) client shared by all requests"""
+        # Pool and protocol settings live on the transport when one is supplied
+        transport = httpx.AsyncHTTPTransport(
+            http2=HTTP2_AVAILABLE,
+            retries=self.CONNECT_RETRIES,
+            limits=httpx.Limits(
+                max_connections=self.MAX_CONNECTIONS,
+                max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=self.KEEPALIVE_EXPIRY
+            )
+        )
+        return httpx.AsyncClient(
             base_url=self.BASE_URL,
-            timeout=self.TIMEOUT,
-            headers=headers
+            timeout=httpx.Timeout(self.TIMEOUT, connect=self.CONNECT_TIMEOUT),
+            headers=self.headers,
+            transport=transport
         )
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The underlying HTTP client, recreated if it has been closed"""
+        if self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
     async def close(self):
         """Close the HTTP client"""
-        await self.client.aclose()
+        await self._client.aclose()
+
+    async def _get_with_retry(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> httpx.Response:
+        """GET a GitHub API path through the rate gate, retrying transient failures; see _send_with_retry"""
+        return await self._send_with_retry(url, lambda: self.client.get(url, params=params, headers=headers))
+
+    async def _send_with_retry(self, url: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Send a GitHub API request through the rate gate, retrying transient failures
+        
+        Network errors and 502/503/504 responses are retried with exponential
+        backoff and jitter. Rate limited responses (403/429 with no requests
+        remaining, or with Retry-After) are retried once the limit resets, when
+        that is at most MAX_RATE_LIMIT_WAIT away, except for Search API requests:
+        those are returned at once so callers fall back to the listing endpoints
+        instead of stalling. Timeouts are not retried, as the request already
+        waited the full timeout.
+        
+        Args:
+            url: API path, used for pacing and logging
+            send: Issues one attempt of the request
+            
+        Returns:
+            The HTTP response of the last attempt
+            
+        Raises:
+            httpx.RequestError: If the last attempt failed at the transport level
+        """
+        for attempt in range(self.MAX_ATTEMPTS):
+            last_attempt = attempt == self.MAX_ATTEMPTS - 1
+            try:
+                async with self._rate_gate(url):
+                    response = await send()
+            except httpx.TimeoutException:
+                raise
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise
+                logger.warning(f"Network error for {url} (attempt {attempt + 1}): {e}")
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            
+            self._record_rate_limit(response.headers)
+            
+            if last_attempt:
+                return response
+            
+            if response.status_code in self.RETRY_STATUSES:
+                logger.warning(f"GitHub returned {response.status_code} for {url} (attempt {attempt + 1})")
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            
+            if response.status_code in (403, 429) and self._rate_resource(url) != "search":
+                wait = self._rate_limit_wait(response.headers)
+                if wait is not None and wait <= self.MAX_RATE_LIMIT_WAIT:
+                    logger.warning(f"Rate limited on {url}, retrying in {wait:.1f}s")
+                    await asyncio.sleep(wait)
+                    continue
+            
+            return response
+
+    @asynccontextmanager
+    async def _rate_gate(self, url: str):
+        """
+        Admit a request, pacing it when the rate limit budget runs low
+        
+        While fewer than LOW_RATE_BUDGET of a resource's requests remain, requests
+        are spaced so the remaining budget lasts until the limit resets, instead
+        of running into 403s. Search requests are not paced, since every search
+        count has a listing fallback that is cheaper than waiting.
+        
+        Args:
+            url: API path, used to pick the rate limit resource
+            
+        Raises:
+            HTTPException: If the request would have to wait more than MAX_RATE_LIMIT_WAIT
+        """
+        resource = self._rate_resource(url)
+        async with self._rate_semaphore:
+            delay = 0.0 if resource == "search" else self._pacing_delay(resource)
+            if delay > 0:
+                logger.debug("Rate limit budget low, delaying %s by %.2fs", url, delay)
+                await asyncio.sleep(delay)
+            yield
+
+    @staticmethod
+    def _rate_resource(url: str) -> str:
+        """Rate limit resource (as in X-RateLimit-Resource) a request to url counts against"""
+        if url.startswith("/search/"):
+            return "search"
+        if url == "/graphql":
+            return "graphql"
+        return "core"
+
+    def _rate_limit_exhausted(self, resource: str) -> bool:
+        """Whether the last response for resource reported no requests left before the reset"""
+        rate_limit = self._rate_limits.get(resource)
+        return rate_limit is not None and rate_limit[0] == 0 and time.time() < rate_limit[2]
+
+    def _pacing_delay(self, resource: str) -> float:
+        """
+        Seconds to wait before the next request to resource may be sent
+        
+        Raises:
+            HTTPException: If the next free slot is more than MAX_RATE_LIMIT_WAIT away
+        """
+        rate_limit = self._rate_limits.get(resource)
+        if rate_limit is None:
+            return 0.0
+        
+        remaining, limit, reset = rate_limit
+        now = time.time()
+        if now >= reset or remaining >= limit * self.LOW_RATE_BUDGET:
+            return 0.0
+        
+        # Hand out evenly spaced slots so the remaining budget spans the window
+        interval = (reset - now) / max(remaining, 1)
+        slot = max(self._next_request_at.get(resource, now), now)
+        if slot - now > self.MAX_RATE_LIMIT_WAIT:
+            # Every slot within the wait limit is taken; sending anyway would burst
+            # into the limit, and waiting longer would only delay the same error
+            raise HTTPException(
+                status_code=403,
+                detail=f"GitHub API rate limit budget exhausted. Retry in {slot - now:.0f}s"
+            )
+        self._next_request_at[resource] = slot + interval
+        return slot - now
+
+    def _record_rate_limit(self, headers) -> None:
+        """Remember the rate limit state reported in response headers"""
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if not (remaining and remaining.isdigit() and reset and reset.isdigit()):
+            return
+        
+        limit = headers.get("X-RateLimit-Limit")
+        resource = headers.get("X-RateLimit-Resource", "core")
+        self._rate_limits[resource] = (
+            int(remaining),
+            int(limit) if limit and limit.isdigit() else 5000,
+            float(reset)
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        """Delay before retry number attempt + 1: exponential with jitter"""
+        return min(2 ** attempt + random.random(), self.MAX_BACKOFF)
+
+    @staticmethod
+    def _rate_limit_wait(headers) -> Optional[float]:
+        """
+        Seconds until a rate limited request may be retried
+        
+        Args:
+            headers: Response headers
+            
+        Returns:
+            Seconds from Retry-After (secondary limits) or until X-RateLimit-Reset
+            when no requests remain, or None if the response is not rate limited
+        """
+        retry_after = headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        
+        reset = headers.get("X-RateLimit-Reset")
+        if headers.get("X-RateLimit-Remaining") == "0" and reset and reset.isdigit():
+            return max(int(reset) - time.time(), 0.0) + 1.0
+        return None
+
+    async def _get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        summarize: Optional[Callable[[bytes], bytes]] = None
+    ) -> httpx.Response:
+        """
+        GET a GitHub API path, revalidating previously seen responses with their ETag
+        
+        ETags and bodies are kept in process. A 304 Not Modified is answered
+        from the cache as a 200 response, so callers handle both cases the same
+        way. With summarize, the cached body is reduced to the parts the caller
+        reads, and only such summaries are shared across workers through Redis.
+        
+        Args:
+            url: API path
+            params: Query parameters
+            summarize: Maps a response body to the smaller JSON body to cache
+            
+        Returns:
+            The HTTP response
+        """
+        key = (url, frozenset((params or {}).items()))
+        shared_key = cache.page_etag_key(url, params)
+        cached = self._etag_cache.get(key)
+        if cached is None and summarize:
+            # Fall back to the ETag another worker stored in Redis, if any
+            shared = await cache.get_etag(shared_key)
+            if shared:
+                etag, body, link = shared
+                cached = (etag, body, httpx.Headers({"Link": link} if link else {}))
+        headers = {"If-None-Match": cached[0]} if cached else None
+        
+        response = await self._get_with_retry(url, params=params, headers=headers)
+        
+        if response.status_code == 304 and cached:
+            _, body, cached_headers = cached
+            self._remember_etag(key, cached)
+            await cache.touch(shared_key)
+            # Keep fresh rate limit headers from the 304 alongside the cached Link header
+            merged = httpx.Headers(cached_headers)
+            merged.update(response.headers)
+            merged.pop("Content-Length", None)
+            return httpx.Response(200, content=body, headers=merged, request=response.request)
+        
+        etag = response.headers.get("ETag")
+        if response.status_code == 200 and etag:
+            # The body is stored decoded, so drop headers describing the wire encoding
+            stored = httpx.Headers(response.headers)
+            stored.pop("Content-Encoding", None)
+            stored.pop("Content-Length", None)
+            body = summarize(response.content) if summarize else response.content
+            self._remember_etag(key, (etag, body, stored))
+            if summarize:
+                await cache.set_etag(shared_key, etag, body, link=response.headers.get("Link"))
+        
+        return response
+
+    def _remember_etag(self, key: Tuple[str, frozenset], entry: Tuple[str, bytes, httpx.Headers]):
+        """Keep an ETag entry in process, evicting the least recently used bodies once full"""
+        if len(entry[1]) > self._etag_cache.maxsize:
+            # Larger than the whole cache; drop any older copy instead
+            self._etag_cache.pop(key, None)
+            return
+        self._etag_cache[key] = entry
 
     async def get_repository(self, owner: str, repo: str) -> Dict[str, Any]:
         """
@@ -48,8 +404,18 @@ class GitHubClient:
         Raises:
             HTTPException: If repository not found or API error
         """
+        # Revalidate a previously seen response instead of downloading it again;
+        # GitHub answers 304 without a body and without charging the rate limit
+        etag_key = cache.repo_etag_key(owner, repo)
+        cached = await cache.get_etag(etag_key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        
         try:
-            response = await self.client.get(f"/repos/{owner}/{repo}")
+            response = await self._get_with_retry(f"/repos/{owner}/{repo}", headers=headers)
+            
+            if response.status_code == 304 and cached:
+                await cache.touch(etag_key)
+                return orjson.loads(cached[1])
             
             if response.status_code == 404:
                 raise HTTPException(
@@ -66,7 +432,12 @@ class GitHubClient:
                 )
             
             response.raise_for_status()
-            return response.json()
+            
+            etag = response.headers.get("ETag")
+            if etag:
+                await cache.set_etag(etag_key, etag, response.content)
+            
+            return orjson.loads(response.content)
             
         except httpx.TimeoutException:
             logger.error(f"Timeout while fetching {owner}/{repo}")
@@ -97,16 +468,14 @@ class GitHubClient:
         per_page = 100  # GitHub API max per page
         max_pages = 100  # Safety limit to prevent infinite loops
         
+        endpoint = f"/repos/{owner}/{repo}/issues"
+        # Built once; only the page number changes between requests
+        params = {"state": "open", "per_page": per_page, "page": page}
+        
         try:
             while page <= max_pages:
-                response = await self.client.get(
-                    f"/repos/{owner}/{repo}/issues",
-                    params={
-                        "state": "open",
-                        "page": page,
-                        "per_page": per_page
-                    }
-                )
+                params["page"] = page
+                response = await self._get(endpoint, params=params, summarize=self._count_summary)
                 
                 if response.status_code == 404:
                     # Repo not found, return 0 issues
@@ -122,23 +491,29 @@ class GitHubClient:
                     )
                 
                 response.raise_for_status()
-                issues = response.json()
+                page_size, open_issues = self._count_page(response.content, include_prs=False)
                 
                 # If no issues returned, we've reached the end
-                if not issues:
-                    logger.debug(f"Reached end of issues for {owner}/{repo} at page {page}")
+                if not page_size:
+                    logger.debug("Reached end of issues for %s/%s at page %d", owner, repo, page)
                     break
                 
-                # Filter out pull requests (GitHub API returns PRs in issues endpoint)
-                # PRs have a "pull_request" key in the response
-                open_issues_only = [issue for issue in issues if "pull_request" not in issue]
-                total_issues += len(open_issues_only)
+                # GitHub API returns PRs in issues endpoint; they are not counted
+                total_issues += open_issues
+                
+                logger.debug("Page %d: Found %d issues (filtered from %d total items)", page, open_issues, page_size)
                 
-                logger.debug(f"Page {page}: Found {len(open_issues_only)} issues (filtered from {len(issues)} total items)")
+                # When GitHub reports the last page, fetch the rest concurrently
+                if page == 1:
+                    last_page = self._parse_last_page(response.headers.get("Link"))
+                    if last_page:
+                        pages = await self._get_remaining_pages(endpoint, params, min(last_page, max_pages))
+                        total_issues += sum(self._count_page(content, include_prs=False)[1] for content in pages)
+                        break
                 
-                # If we got fewer than per_page items, we're on the last page
-                if len(issues) < per_page:
-                    logger.debug(f"Last page reached for {owner}/{repo} at page {page}")
+                # GitHub omits rel="next" on the last page (and the Link header when there is one page)
+                if page_size < per_page or not self._has_next_page(response.headers.get("Link")):
+                    logger.debug("Last page reached for %s/%s at page %d", owner, repo, page)
                     break
                 
                 page += 1
@@ -168,22 +543,117 @@ class GitHubClient:
                 detail=f"Error counting issues: {str(e)}"
             )
 
-    async def fetch_repository_metrics(self, owner: str, repo: str, include_detailed: bool = True) -> Dict[str, Any]:
+    async def fetch_repository_metrics(
+        self,
+        owner: str,
+        repo: str,
+        include_detailed: bool = True,
+        force: bool = False
+    ) -> Dict[str, Any]:
         """
         Fetch complete repository metrics including stars, issues, and language
         
+        Results are kept in memory for METRICS_CACHE_TTL seconds; past half of
+        that, the cached value is still returned while it is refreshed in the
+        background. Concurrent calls for the same repository share a single fetch.
+        
         Args:
             owner: Repository owner
             repo: Repository name
             include_detailed: Whether to fetch detailed issue/PR counts (opened/closed)
+            force: Bypass the in-memory cache
             
         Returns:
             Dictionary with metrics: stars, issues, language, and optionally detailed counts
         """
+        # GitHub names are case-insensitive, so case variants share one entry
+        key = self._metrics_key(owner, repo, include_detailed)
+        
+        cached = None if force else self._metrics_cache.get(key)
+        if cached:
+            fetched_at, result = cached
+            if time.monotonic() - fetched_at > self.METRICS_CACHE_TTL / 2:
+                # Stale while revalidate: answer now, refresh for the next caller
+                self._start_metrics_fetch(key, owner, repo)
+            return dict(result)
+        
+        task = self._start_metrics_fetch(key, owner, repo)
+        # Shield so one caller going away does not cancel the fetch for the others
+        return dict(await asyncio.shield(task))
+
+    @staticmethod
+    def _metrics_key(owner: str, repo: str, include_detailed: bool) -> Tuple[str, str, bool]:
+        return normalize_name(owner), normalize_name(repo), include_detailed
+
+    def forget_metrics(self, owner: str, repo: str) -> None:
+        """
+        Drop in-memory metrics for a repository, e.g. once newer values were stored
+        
+        Fetches already in flight still answer their callers but no longer
+        cache their result.
+        """
+        for include_detailed in (True, False):
+            key = self._metrics_key(owner, repo, include_detailed)
+            self._metrics_cache.pop(key, None)
+            self._inflight.pop(key, None)
+
+    def _start_metrics_fetch(self, key: Tuple[str, str, bool], owner: str, repo: str) -> asyncio.Task:
+        """Return the in-flight fetch for key, starting one for owner/repo if there is none"""
+        task = self._inflight.get(key)
+        if task is not None:
+            logger.debug("Joining in-flight metrics fetch for %s/%s", owner, repo)
+            return task
+        
+        async def fetch_and_cache() -> Dict[str, Any]:
+            result = await self._fetch_repository_metrics(owner, repo, key[2])
+            # Skip caching if forget_metrics ran while this fetch was in flight
+            if self._inflight.get(key) is asyncio.current_task():
+                self._metrics_cache[key] = (time.monotonic(), result)
+            return result
+        
+        def finished(done: asyncio.Task):
+            if self._inflight.get(key) is done:
+                self._inflight.pop(key)
+            # Background refreshes have nobody awaiting them, so report failures here
+            if not done.cancelled() and done.exception() is not None:
+                logger.warning(f"Metrics fetch for {owner}/{repo} failed: {done.exception()}")
+        
+        task = asyncio.create_task(fetch_and_cache())
+        self._inflight[key] = task
+        task.add_done_callback(finished)
+        return task
+
+    async def _fetch_repository_metrics(self, owner: str, repo: str, include_detailed: bool) -> Dict[str, Any]:
+        """Fetch repository metrics; see fetch_repository_metrics"""
         logger.info(f"Fetching metrics for {owner}/{repo}")
         
-        # Fetch repository metadata
-        repo_data = await self.get_repository(owner, repo)
+        # GraphQL returns every count in one request but requires a token
+        if "Authorization" in self.headers:
+            result = await self.fetch_metrics_graphql(owner, repo, include_detailed)
+            if result is not None:
+                logger.info(f"Successfully fetched metrics for {owner}/{repo} via GraphQL: {result}")
+                return result
+            logger.warning(f"GraphQL metrics unavailable for {owner}/{repo}, falling back to REST")
+        
+        # Metadata and counts are independent requests, so issue them concurrently;
+        # only a metadata failure aborts, count failures fall back below.
+        # Detailed counts include open issues, so they are not counted separately
+        if include_detailed:
+            counts_task = asyncio.create_task(self.get_issues_and_prs_counts(owner, repo))
+        else:
+            counts_task = asyncio.create_task(self.get_open_issues_count(owner, repo))
+        
+        try:
+            repo_data = await self.get_repository(owner, repo)
+        except BaseException:
+            # The counts would be discarded, so stop spending rate limit budget on them
+            counts_task.cancel()
+            raise
+        
+        try:
+            counts = await counts_task
+        except Exception as e:
+            counts = e
         
         # Extract basic info
         stars = repo_data.get("stargazers_count", 0)
@@ -191,14 +661,23 @@ class GitHubClient:
         
         logger.info(f"Repository {owner}/{repo}: {stars} stars, language: {language}")
         
-        # Fetch open issues count (with pagination)
-        try:
-            issues_count = await self.get_open_issues_count(owner, repo)
-        except Exception as e:
-            logger.error(f"Error fetching issues count for {owner}/{repo}: {str(e)}")
-            # Fallback to repository's open_issues_count if pagination fails
+        if isinstance(counts, Exception):
+            logger.error(f"Error fetching issues count for {owner}/{repo}: {str(counts)}")
+            # Fallback to repository's open_issues_count if counting fails
             issues_count = repo_data.get("open_issues_count", 0)
             logger.warning(f"Using repository's open_issues_count as fallback: {issues_count}")
+            if include_detailed:
+                # Set defaults if detailed fetch fails
+                counts = {
+                    "issues_open": issues_count,
+                    "issues_closed": 0,
+                    "prs_open": 0,
+                    "prs_closed": 0
+                }
+        elif include_detailed:
+            issues_count = counts["issues_open"]
+        else:
+            issues_count = counts
         
         result = {
             "owner": owner,
@@ -208,112 +687,283 @@ class GitHubClient:
             "language": language
         }
         
-        # Fetch detailed issue and PR counts if requested
         if include_detailed:
-            try:
-                detailed_counts = await self.get_issues_and_prs_counts(owner, repo)
-                result.update(detailed_counts)
-            except Exception as e:
-                logger.warning(f"Error fetching detailed counts for {owner}/{repo}: {str(e)}")
-                # Set defaults if detailed fetch fails
-                result.update({
-                    "issues_open": issues_count,
-                    "issues_closed": 0,
-                    "prs_open": 0,
-                    "prs_closed": 0
-                })
+            result.update(counts)
         
         logger.info(f"Successfully fetched metrics for {owner}/{repo}: {result}")
         return result
 
-    async def get_owner_repositories(self, owner: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    async def fetch_metrics_graphql(
+        self,
+        owner: str,
+        repo: str,
+        include_detailed: bool = True
+    ) -> Optional[Dict[str, Any]]:
         """
-        Fetch all repositories for a GitHub owner/user
+        Fetch repository metrics with a single GraphQL query
         
         Args:
-            owner: GitHub username or organization name
-            limit: Optional limit on number of repositories to return
+            owner: Repository owner
+            repo: Repository name
+            include_detailed: Whether to include detailed issue/PR counts (opened/closed)
             
         Returns:
-            List of repository dictionaries with basic info
+            Metrics in the same shape as fetch_repository_metrics, or None when
+            GitHub rejected the query (4xx or GraphQL errors) and REST should be used
+            
+        Raises:
+            HTTPException: On timeout or network error
+        """
+        data = await self._post_graphql(METRICS_QUERY, {"owner": owner, "repo": repo})
+        if data is None:
+            return None
+        
+        repository = (data.get("data") or {}).get("repository")
+        if data.get("errors") or repository is None:
+            logger.warning(f"GraphQL query for {owner}/{repo} returned errors: {data.get('errors')}")
+            return None
+        
+        return self._graphql_metrics(owner, repo, repository, include_detailed)
+
+    async def fetch_metrics_batch(self, pairs: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch detailed metrics for many repositories with aliased GraphQL queries
+        
+        Repositories are queried GRAPHQL_BATCH_SIZE at a time, with the chunks
+        sent concurrently. Chunks GitHub rejects (or every chunk, without a
+        token) fall back to fetch_repository_metrics per repository.
+        
+        Args:
+            pairs: (owner, repo) tuples
+            
+        Returns:
+            Metrics for each pair in order, or None for repositories not found
+            
+        Raises:
+            HTTPException: If a repository the batch could not answer fails on its own fetch too
+        """
+        size = self.GRAPHQL_BATCH_SIZE
+        chunks = [pairs[i:i + size] for i in range(0, len(pairs), size)]
+        results = await asyncio.gather(*(self._fetch_metrics_chunk(chunk) for chunk in chunks))
+        return [metrics for chunk in results for metrics in chunk]
+
+    async def _fetch_metrics_chunk(self, pairs: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """Fetch metrics for one chunk of fetch_metrics_batch"""
+        if "Authorization" in self.headers:
+            # Owners and names are passed as variables, never spliced into the query
+            definitions = ", ".join(f"$o{i}: String!, $r{i}: String!" for i in range(len(pairs)))
+            fields = " ".join(
+                f"r{i}: repository(owner: $o{i}, name: $r{i}) {{ ...MetricsFields }}"
+                for i in range(len(pairs))
+            )
+            variables = {}
+            for i, (owner, repo) in enumerate(pairs):
+                variables[f"o{i}"] = owner
+                variables[f"r{i}"] = repo
+            
+            data = await self._post_graphql(f"query({definitions}) {{ {fields} }}" + METRICS_FIELDS, variables)
+            repositories = (data or {}).get("data")
+            if repositories is not None:
+                return await self._batch_results(pairs, repositories, data.get("errors") or [])
+            logger.warning(f"GraphQL batch of {len(pairs)} repositories unavailable, falling back to REST")
+        
+        return await self._fetch_each(pairs)
+
+    async def _batch_results(
+        self,
+        pairs: List[Tuple[str, str]],
+        repositories: Dict[str, Any],
+        errors: List[Dict[str, Any]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Map an aliased GraphQL response back onto pairs
+        
+        A null alias means not found only when its error is NOT_FOUND; aliases
+        that failed for any other reason (rate limits, timeouts, permissions)
+        are fetched again one by one, so those errors surface from there.
+        """
+        error_types = {
+            error["path"][0]: error.get("type")
+            for error in errors
+            if error.get("path")
+        }
+        results: List[Optional[Dict[str, Any]]] = []
+        retry = []
+        for i, (owner, repo) in enumerate(pairs):
+            repository = repositories.get(f"r{i}")
+            if repository:
+                results.append(self._graphql_metrics(owner, repo, repository, True))
+                continue
+            results.append(None)
+            if error_types.get(f"r{i}") != "NOT_FOUND":
+                retry.append(i)
+        
+        if retry:
+            logger.warning(f"GraphQL batch failed for {len(retry)} repositories, fetching them individually")
+            fetched = await self._fetch_each([pairs[i] for i in retry])
+            for i, metrics in zip(retry, fetched):
+                results[i] = metrics
+        return results
+
+    async def _fetch_each(self, pairs: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """Fetch detailed metrics per repository, with None for repositories not found"""
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+        
+        async def fetch_one(owner: str, repo: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self.fetch_repository_metrics(owner, repo, include_detailed=True)
+                except HTTPException as e:
+                    if e.status_code == 404:
+                        return None
+                    raise
+        
+        return await asyncio.gather(*(fetch_one(owner, repo) for owner, repo in pairs))
+
+    async def _post_graphql(self, query: str, variables: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        POST a query to the GraphQL endpoint
+        
+        Goes through the same rate gate and retries as REST requests.
+        
+        Args:
+            query: GraphQL query document
+            variables: Query variables
+            
+        Returns:
+            The decoded response body, or None if GitHub rejected the request with a 4xx
+            
+        Raises:
+            HTTPException: On timeout or network error
+        """
+        content = orjson.dumps({"query": query, "variables": variables})
+        try:
+            response = await self._send_with_retry("/graphql", lambda: self.client.post(
+                "/graphql",
+                content=content,
+                headers={"Content-Type": "application/json"}
+            ))
+        except httpx.TimeoutException:
+            logger.error("Timeout while querying GitHub GraphQL API")
+            raise HTTPException(
+                status_code=504,
+                detail="Request to GitHub API timed out"
+            )
+        except httpx.RequestError as e:
+            logger.error(f"Network error while querying GitHub GraphQL API: {e}")
+            raise HTTPException(
+                status_code=503,
+                detail=f"Failed to connect to GitHub API: {str(e)}"
+            )
+        
+        if 400 <= response.status_code < 500:
+            logger.warning(f"GraphQL request rejected with status {response.status_code}")
+            return None
+        
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    @staticmethod
+    def _graphql_metrics(
+        owner: str,
+        repo: str,
+        repository: Dict[str, Any],
+        include_detailed: bool
+    ) -> Dict[str, Any]:
+        """Convert a MetricsFields GraphQL result into the metrics dictionary"""
+        language = repository.get("primaryLanguage")
+        result = {
+            "owner": owner,
+            "repo": repo,
+            "stars": repository["stargazerCount"],
+            "issues": repository["issues_open"]["totalCount"],
+            "language": language["name"] if language else None
+        }
+        if include_detailed:
+            for key in ("issues_open", "issues_closed", "prs_open", "prs_closed"):
+                result[key] = repository[key]["totalCount"]
+        return result
+
+    async def get_owner_repositories(self, owner: str, limit: Optional[int] = None) -> AsyncIterator[RepoRow]:
+        """
+        Stream all repositories for a GitHub owner/user
+        
+        The first page is fetched on its own; when GitHub reports the last page
+        in the Link header, the remaining pages are fetched concurrently and
+        yielded in order. Page requests still pending once the limit is reached
+        (or the caller stops iterating) are cancelled.
+        
+        Args:
+            owner: GitHub username or organization name
+            limit: Optional limit on number of repositories to yield
+            
+        Yields:
+            RepoRow for each repository
         """
-        all_repos = []
-        page = 1
         per_page = 100  # GitHub API max per page
         max_pages = 100  # Safety limit
+        yielded = 0
+        tasks: List[asyncio.Task] = []
         
         logger.info(f"Fetching repositories for owner: {owner}")
         
         try:
-            while page <= max_pages:
-                response = await self.client.get(
-                    f"/users/{owner}/repos",
-                    params={
-                        "page": page,
-                        "per_page": per_page,
-                        "sort": "updated",
-                        "direction": "desc"
-                    }
-                )
+            response = await self._get_owner_repositories_page(owner, 1, per_page)
+            last_page = self._parse_last_page(response.headers.get("Link"))
+            
+            if last_page:
+                # Only request the pages needed to satisfy the limit
+                last_page = min(last_page, max_pages)
+                if limit:
+                    last_page = min(last_page, math.ceil(limit / per_page))
                 
-                if response.status_code == 404:
-                    logger.warning(f"Owner '{owner}' not found on GitHub")
-                    raise HTTPException(
-                        status_code=404,
-                        detail=f"Owner '{owner}' not found on GitHub"
-                    )
+                semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
                 
-                if response.status_code == 403:
-                    rate_limit_info = response.headers.get("X-RateLimit-Remaining", "unknown")
-                    logger.error(f"Rate limit exceeded for owner {owner}. Remaining: {rate_limit_info}")
-                    raise HTTPException(
-                        status_code=403,
-                        detail=f"GitHub API rate limit exceeded. Remaining: {rate_limit_info}"
-                    )
+                async def fetch_page(page: int) -> httpx.Response:
+                    async with semaphore:
+                        return await self._get_owner_repositories_page(owner, page, per_page)
                 
-                response.raise_for_status()
-                repos = response.json()
+                tasks = [asyncio.create_task(fetch_page(page)) for page in range(2, last_page + 1)]
+                pending = iter(tasks)
                 
-                # If no repos returned, we've reached the end
-                if not repos:
-                    logger.debug(f"Reached end of repositories for {owner} at page {page}")
-                    break
-                
-                # Extract relevant information from each repo
-                for repo in repos:
-                    repo_info = {
-                        "name": repo.get("name"),
-                        "full_name": repo.get("full_name"),
-                        "owner": repo.get("owner", {}).get("login"),
-                        "description": repo.get("description"),
-                        "stars": repo.get("stargazers_count", 0),
-                        "forks": repo.get("forks_count", 0),
-                        "open_issues": repo.get("open_issues_count", 0),
-                        "language": repo.get("language"),
-                        "is_private": repo.get("private", False),
-                        "is_fork": repo.get("fork", False),
-                        "created_at": repo.get("created_at"),
-                        "updated_at": repo.get("updated_at"),
-                        "pushed_at": repo.get("pushed_at"),
-                        "url": repo.get("html_url"),
-                        "api_url": repo.get("url")
-                    }
-                    all_repos.append(repo_info)
+                while True:
+                    for repo in orjson.loads(response.content):
+                        yield self._extract_repo_row(repo)
+                        yielded += 1
+                        if limit and yielded >= limit:
+                            logger.info(f"Reached limit of {limit} repositories for {owner}")
+                            return
                     
-                    # Check if we've reached the limit
-                    if limit and len(all_repos) >= limit:
-                        logger.info(f"Reached limit of {limit} repositories for {owner}")
-                        return all_repos[:limit]
-                
-                # If we got fewer than per_page items, we're on the last page
-                if len(repos) < per_page:
-                    logger.debug(f"Last page reached for {owner} at page {page}")
-                    break
-                
-                page += 1
+                    task = next(pending, None)
+                    if task is None:
+                        break
+                    response = await task
+            else:
+                # No rel="last": walk pages while GitHub links a next one
+                page = 1
+                while True:
+                    repos = orjson.loads(response.content)
+                    
+                    # If no repos returned, we've reached the end
+                    if not repos:
+                        logger.debug("Reached end of repositories for %s at page %d", owner, page)
+                        break
+                    
+                    for repo in repos:
+                        yield self._extract_repo_row(repo)
+                        yielded += 1
+                        if limit and yielded >= limit:
+                            logger.info(f"Reached limit of {limit} repositories for {owner}")
+                            return
+                    
+                    if len(repos) < per_page or page >= max_pages or not self._has_next_page(response.headers.get("Link")):
+                        logger.debug("Last page reached for %s at page %d", owner, page)
+                        break
+                    
+                    page += 1
+                    response = await self._get_owner_repositories_page(owner, page, per_page)
             
-            logger.info(f"Fetched {len(all_repos)} repositories for {owner}")
-            return all_repos
+            logger.info(f"Fetched {yielded} repositories for {owner}")
                 
         except httpx.TimeoutException:
             logger.error(f"Timeout while fetching repositories for {owner}")
@@ -336,6 +986,197 @@ class GitHubClient:
                 status_code=500,
                 detail=f"Error fetching repositories: {str(e)}"
             )
+        finally:
+            # Stop page requests nobody will read, and retrieve failures of finished ones
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()
+
+    async def _get_owner_repositories_page(self, owner: str, page: int, per_page: int) -> httpx.Response:
+        """
+        Fetch a single page of an owner's repositories
+        
+        Args:
+            owner: GitHub username or organization name
+            page: Page number (1-based)
+            per_page: Number of repositories per page
+            
+        Returns:
+            The successful HTTP response
+            
+        Raises:
+            HTTPException: If owner not found or rate limit exceeded
+        """
+        response = await self._get(
+            f"/users/{owner}/repos",
+            params={
+                "page": page,
+                "per_page": per_page,
+                "sort": "updated",
+                "direction": "desc"
+            },
+            summarize=self._repo_rows_summary
+        )
+        
+        if response.status_code == 404:
+            logger.warning(f"Owner '{owner}' not found on GitHub")
+            raise HTTPException(
+                status_code=404,
+                detail=f"Owner '{owner}' not found on GitHub"
+            )
+        
+        if response.status_code == 403:
+            rate_limit_info = response.headers.get("X-RateLimit-Remaining", "unknown")
+            logger.error(f"Rate limit exceeded for owner {owner}. Remaining: {rate_limit_info}")
+            raise HTTPException(
+                status_code=403,
+                detail=f"GitHub API rate limit exceeded. Remaining: {rate_limit_info}"
+            )
+        
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _extract_repo_row(repo: Dict[str, Any]) -> RepoRow:
+        """Extract the relevant fields from a GitHub repository payload"""
+        return RepoRow(
+            name=repo.get("name"),
+            full_name=repo.get("full_name"),
+            owner=repo.get("owner", {}).get("login"),
+            description=repo.get("description"),
+            stars=repo.get("stargazers_count", 0),
+            forks=repo.get("forks_count", 0),
+            open_issues=repo.get("open_issues_count", 0),
+            language=repo.get("language"),
+            is_private=repo.get("private", False),
+            is_fork=repo.get("fork", False),
+            created_at=repo.get("created_at"),
+            updated_at=repo.get("updated_at"),
+            pushed_at=repo.get("pushed_at"),
+            url=repo.get("html_url"),
+            api_url=repo.get("url")
+        )
+
+    @staticmethod
+    def _repo_rows_summary(content: bytes) -> bytes:
+        """Reduce a repositories page to the fields _extract_repo_row reads"""
+        return orjson.dumps([
+            {
+                **{field: repo[field] for field in REPO_PAYLOAD_FIELDS if field in repo},
+                "owner": {"login": (repo.get("owner") or {}).get("login")}
+            }
+            for repo in orjson.loads(content)
+        ])
+
+    @staticmethod
+    def _count_summary(content: bytes) -> bytes:
+        """Reduce an issues or pulls page to what _count_page reads: one marker per item"""
+        return orjson.dumps([
+            {"pull_request": True} if "pull_request" in item else {}
+            for item in orjson.loads(content)
+        ])
+
+    @staticmethod
+    def _search_summary(content: bytes) -> bytes:
+        """Reduce a search response to its total_count and incomplete_results flag"""
+        data = orjson.loads(content)
+        return orjson.dumps({
+            "total_count": data.get("total_count"),
+            "incomplete_results": data.get("incomplete_results", False)
+        })
+
+    @staticmethod
+    def _count_page(content: bytes, include_prs: bool) -> Tuple[int, int]:
+        """
+        Count the items of an issues or pulls page
+        
+        Args:
+            content: Raw JSON body of the page
+            include_prs: Whether items with a "pull_request" key are counted
+            
+        Returns:
+            Tuple of (items on the page, items counted)
+        """
+        items = orjson.loads(content)
+        page_size = len(items)
+        if include_prs:
+            return page_size, page_size
+        # Sum the membership tests directly rather than building a filtered list
+        return page_size, page_size - sum("pull_request" in item for item in items)
+
+    @staticmethod
+    def _has_next_page(link_header: Optional[str]) -> bool:
+        """Whether a GitHub Link header points to a next page"""
+        return bool(link_header) and LINK_NEXT_RE.search(link_header) is not None
+
+    @staticmethod
+    def _parse_last_page(link_header: Optional[str]) -> Optional[int]:
+        """
+        Extract the last page number from a GitHub Link header
+        
+        Args:
+            link_header: Value of the Link response header, if any
+            
+        Returns:
+            The page number of rel="last", or None if not present
+        """
+        if not link_header:
+            return None
+        
+        for part in link_header.split(","):
+            match = LINK_LAST_RE.search(part)
+            if match:
+                page_match = PAGE_PARAM_RE.search(match.group(1))
+                if page_match:
+                    return int(page_match.group(1))
+        return None
+
+    async def _get_remaining_pages(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        last_page: int
+    ) -> List[bytes]:
+        """
+        Fetch pages 2..last_page of a list endpoint concurrently
+        
+        Args:
+            endpoint: API endpoint path
+            params: Query parameters shared by every page
+            last_page: Last page number to fetch
+            
+        Returns:
+            Raw JSON body of each page, in page order
+            
+        Raises:
+            HTTPException: If the rate limit is exceeded
+        """
+        semaphore = asyncio.Semaphore(self.COUNT_CONCURRENCY)
+        
+        async def fetch_page(page: int) -> bytes:
+            async with semaphore:
+                response = await self._get(endpoint, params={**params, "page": page}, summarize=self._count_summary)
+            
+            if response.status_code == 403:
+                rate_limit_info = response.headers.get("X-RateLimit-Remaining", "unknown")
+                raise HTTPException(
+                    status_code=403,
+                    detail=f"GitHub API rate limit exceeded. Remaining: {rate_limit_info}"
+                )
+            
+            response.raise_for_status()
+            return response.content
+        
+        results = await asyncio.gather(
+            *(fetch_page(page) for page in range(2, last_page + 1)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
 
     async def get_issues_and_prs_counts(self, owner: str, repo: str) -> Dict[str, int]:
         """
@@ -357,36 +1198,87 @@ class GitHubClient:
         
         logger.info(f"Fetching detailed issues and PRs counts for {owner}/{repo}")
         
-        # Fetch open issues (excluding PRs)
-        try:
-            counts["issues_open"] = await self._count_items(f"/repos/{owner}/{repo}/issues", "open", is_pr=False)
-        except Exception as e:
-            logger.warning(f"Error counting open issues for {owner}/{repo}: {str(e)}")
-        
-        # Fetch closed issues (excluding PRs)
-        try:
-            counts["issues_closed"] = await self._count_items(f"/repos/{owner}/{repo}/issues", "closed", is_pr=False)
-        except Exception as e:
-            logger.warning(f"Error counting closed issues for {owner}/{repo}: {str(e)}")
-        
-        # Fetch open PRs
-        try:
-            counts["prs_open"] = await self._count_items(f"/repos/{owner}/{repo}/pulls", "open", is_pr=True)
-        except Exception as e:
-            logger.warning(f"Error counting open PRs for {owner}/{repo}: {str(e)}")
+        # The four counts are independent, so fetch them concurrently
+        results = await asyncio.gather(
+            self._count(owner, repo, "issue", "open"),
+            self._count(owner, repo, "issue", "closed"),
+            self._count(owner, repo, "pr", "open"),
+            self._count(owner, repo, "pr", "closed"),
+            return_exceptions=True
+        )
         
-        # Fetch closed PRs
-        try:
-            counts["prs_closed"] = await self._count_items(f"/repos/{owner}/{repo}/pulls", "closed", is_pr=True)
-        except Exception as e:
-            logger.warning(f"Error counting closed PRs for {owner}/{repo}: {str(e)}")
+        for key, result in zip(counts, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Error counting {key.replace('_', ' ')} for {owner}/{repo}: {str(result)}")
+            else:
+                counts[key] = result
         
         logger.info(f"Counts for {owner}/{repo}: {counts}")
         return counts
 
+    async def _count(self, owner: str, repo: str, kind: Literal["issue", "pr"], state: str) -> int:
+        """
+        Count issues or PRs, preferring the Search API over paginating the list
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            kind: "issue" or "pr"
+            state: "open" or "closed"
+            
+        Returns:
+            Total count of items
+        """
+        count = await self._search_count(owner, repo, kind, state)
+        if count is not None:
+            return count
+        
+        logger.debug("Search unavailable for %s/%s %ss, counting from list pages instead", owner, repo, kind)
+        endpoint = f"/repos/{owner}/{repo}/{'pulls' if kind == 'pr' else 'issues'}"
+        return await self._count_items(endpoint, state, is_pr=kind == "pr")
+
+    async def _search_count(self, owner: str, repo: str, kind: Literal["issue", "pr"], state: str) -> Optional[int]:
+        """
+        Count issues or PRs with a single Search API request
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            kind: "issue" or "pr"
+            state: "open" or "closed"
+            
+        Returns:
+            The total_count reported by GitHub, or None when the search was
+            rejected (422), rate limited (403/429, or no budget left until the
+            reset) or returned incomplete results
+        """
+        if self._rate_limit_exhausted("search"):
+            # Known to fail until the reset, so fall back without spending a request
+            return None
+        
+        async with self._search_semaphore:
+            response = await self._get(
+                "/search/issues",
+                params={"q": f"repo:{owner}/{repo} is:{kind} is:{state}", "per_page": 1},
+                summarize=self._search_summary
+            )
+        
+        if response.status_code in (403, 422, 429):
+            logger.warning(f"Search count for {owner}/{repo} failed with status {response.status_code}")
+            return None
+        
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        if data.get("incomplete_results"):
+            return None
+        return data["total_count"]
+
     async def _count_items(self, endpoint: str, state: str, is_pr: bool = False) -> int:
         """
-        Helper method to count items (issues or PRs) with pagination
+        Helper method to count items (issues or PRs) without downloading them
+        
+        The issues endpoint also lists pull requests, so when counting issues
+        the matching pulls count is subtracted.
         
         Args:
             endpoint: API endpoint path
@@ -396,50 +1288,16 @@ class GitHubClient:
         Returns:
             Total count of items
         """
-        total_count = 0
-        page = 1
-        per_page = 100
-        max_pages = 100
-        
         try:
-            while page <= max_pages:
-                response = await self.client.get(
-                    endpoint,
-                    params={
-                        "state": state,
-                        "page": page,
-                        "per_page": per_page
-                    }
-                )
-                
-                if response.status_code == 404:
-                    return 0
-                
-                if response.status_code == 403:
-                    rate_limit_info = response.headers.get("X-RateLimit-Remaining", "unknown")
-                    raise HTTPException(
-                        status_code=403,
-                        detail=f"GitHub API rate limit exceeded. Remaining: {rate_limit_info}"
-                    )
-                
-                response.raise_for_status()
-                items = response.json()
-                
-                if not items:
-                    break
-                
-                # For issues endpoint, filter out PRs if needed
-                if not is_pr:
-                    items = [item for item in items if "pull_request" not in item]
-                
-                total_count += len(items)
-                
-                if len(items) < per_page:
-                    break
-                
-                page += 1
+            if is_pr:
+                return await self._count_listing(endpoint, state)
             
-            return total_count
+            pulls_endpoint = endpoint.rsplit("/", 1)[0] + "/pulls"
+            items, prs = await asyncio.gather(
+                self._count_listing(endpoint, state),
+                self._count_listing(pulls_endpoint, state)
+            )
+            return max(items - prs, 0)
             
         except HTTPException:
             raise
@@ -447,3 +1305,40 @@ class GitHubClient:
             logger.error(f"Error counting items from {endpoint}: {str(e)}")
             raise
 
+    async def _count_listing(self, endpoint: str, state: str) -> int:
+        """
+        Count the items of a list endpoint from the Link header of a one-item page
+        
+        With per_page=1 the rel="last" page number is the total number of items.
+        
+        Args:
+            endpoint: API endpoint path
+            state: "open" or "closed"
+            
+        Returns:
+            Total count of items, or 0 if the repository was not found
+            
+        Raises:
+            HTTPException: If the rate limit is exceeded
+        """
+        response = await self._get(endpoint, params={"state": state, "per_page": 1, "page": 1}, summarize=self._count_summary)
+        
+        if response.status_code == 404:
+            return 0
+        
+        if response.status_code == 403:
+            rate_limit_info = response.headers.get("X-RateLimit-Remaining", "unknown")
+            raise HTTPException(
+                status_code=403,
+                detail=f"GitHub API rate limit exceeded. Remaining: {rate_limit_info}"
+            )
+        
+        response.raise_for_status()
+        last_page = self._parse_last_page(response.headers.get("Link"))
+        if last_page:
+            return last_page
+        # No Link header: everything fit on this page
+        return len(orjson.loads(response.content))
+
+# Shared client so every router reuses the same connection pool
+github_client = GitHubClient()
@@ -1,11 +1,16 @@
 """
-Database migration script to add new columns for detailed issue/PR tracking.
+Database migration script to add new columns for detailed issue/PR tracking
+and the unique (owner, repo), language and (lower(owner), language) indexes.
 
-Run this script once to update existing database with new columns.
+Run this script once to update existing database with new columns. If the
+database has no tables yet, the full schema is created instead.
 """
-from sqlalchemy import create_engine, text, inspect
-from app.database import SQLALCHEMY_DATABASE_URL
+from sqlalchemy import text, inspect
+from sqlalchemy.exc import SAWarning
+from app.database import Base, engine
+from app import models  # noqa: F401 - registers the tables on Base.metadata
 import os
+import warnings
 
 def column_exists(conn, table_name, column_name):
     """Check if a column exists in a table"""
@@ -15,13 +20,12 @@ def column_exists(conn, table_name, column_name):
 
 def migrate_database():
     """Add new columns to repositories table if they don't exist"""
-    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-    
     with engine.begin() as conn:
         # Check if table exists first
         inspector = inspect(engine)
         if 'repositories' not in inspector.get_table_names():
-            print("Repositories table does not exist. It will be created automatically on first run.")
+            Base.metadata.create_all(bind=conn)
+            print("[OK] Created database tables")
             return
         
         # Check and add columns if they don't exist
@@ -45,6 +49,54 @@ def migrate_database():
             else:
                 print(f"[SKIP] Column {column_name} already exists")
         
+        # Replace the single-column repo index with a unique (owner, repo) index
+        with warnings.catch_warnings():
+            # Skipped reflection of the expression-based lower(owner) index
+            warnings.simplefilter("ignore", SAWarning)
+            indexes = {index['name'] for index in inspector.get_indexes('repositories')}
+        if 'uq_repo_owner_repo' not in indexes:
+            # Keep only the most recent row for any duplicated repository
+            result = conn.execute(text("""
+                DELETE FROM repositories
+                WHERE id NOT IN (
+                    SELECT MAX(id) FROM repositories GROUP BY owner, repo
+                )
+            """))
+            if result.rowcount:
+                print(f"[OK] Removed {result.rowcount} duplicate repository rows")
+            conn.execute(text("""
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_repo_owner_repo
+                ON repositories (owner, repo)
+            """))
+            print("[OK] Added unique index uq_repo_owner_repo")
+        else:
+            print("[SKIP] Index uq_repo_owner_repo already exists")
+        
+        # Expression indexes are not reflected, so rely on IF NOT EXISTS
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_repo_owner_lower_language
+            ON repositories (lower(owner), language)
+        """))
+        print("[OK] Ensured index ix_repo_owner_lower_language exists")
+        
+        # The composite index above covers lower(owner) lookups on its own
+        conn.execute(text("DROP INDEX IF EXISTS ix_repo_owner_lower"))
+        
+        if 'ix_repositories_language' not in indexes:
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_repositories_language
+                ON repositories (language)
+            """))
+            print("[OK] Added index ix_repositories_language")
+        else:
+            print("[SKIP] Index ix_repositories_language already exists")
+        
+        # uq_repo_owner_repo and the lower(owner) index cover what these served
+        for redundant in ('ix_repositories_repo', 'ix_repositories_owner'):
+            if redundant in indexes:
+                conn.execute(text(f"DROP INDEX IF EXISTS {redundant}"))
+                print(f"[OK] Dropped redundant index {redundant}")
+        
         print("\nMigration completed successfully!")
 
 if __name__ == "__main__":
@@ -1,45 +1,221 @@
+import fnmatch
+import os
+import httpx
 import pytest
-from sqlalchemy import create_engine
+import pytest_asyncio
+from unittest.mock import patch
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from app.database import Base, get_db
+from sqlalchemy.pool import StaticPool
+
+# Tests get their schema from db_engine; without this the app's lifespan would
+# also create tables in the real database file, which parallel workers share
+os.environ.setdefault("RUN_MIGRATIONS", "0")
+# The suite repeats identical /repos queries; a single process can reuse them safely
+os.environ.setdefault("REPO_QUERY_CACHE_TTL", "5")
+
+from app.database import Base, _bump_data_version, get_db
+from app.models import Repository
 from app.main import app
 from fastapi.testclient import TestClient
 
-# Use in-memory SQLite for testing
+# Use in-memory SQLite for testing; every pytest-xdist worker is its own process
+# and so gets a private database
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
+# StaticPool keeps the single in-memory database alive across connections
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
 )
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work with pysqlite
+    dbapi_connection.isolation_level = None
 
-@pytest.fixture(scope="function")
-def db_session():
-    """Create a fresh database for each test"""
+
+@event.listens_for(engine, "connect")
+def _set_test_pragmas(dbapi_connection, connection_record):
+    # Durability is irrelevant for a throwaway test database
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+@event.listens_for(engine, "begin")
+def _begin_transaction(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+# Rolling back a test's SAVEPOINT removes rows the app may have cached listings
+# of, which no commit event reports
+event.listen(engine, "rollback_savepoint", _bump_data_version)
+
+
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+def make_repo(repo, **overrides):
+    """Build a repositories row for seeding; defaults to a facebook JavaScript repo"""
+    return {"owner": "facebook", "repo": repo, "stars": 0, "issues": 0, "language": "JavaScript", **overrides}
+
+
+# Plain Core insert, built once and run as an executemany; skips the ORM bulk path
+INSERT_REPO = Repository.__table__.insert()
+
+# Seed rows shared by the listing and aggregate tests, built once at import time
+REPO_FIXTURES = [
+    make_repo("react", stars=200000, issues=500),
+    make_repo("vscode", owner="microsoft", stars=150000, issues=200, language="TypeScript"),
+    make_repo("react-native", stars=110000, issues=300),
+]
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """Create the schema once for the whole test session"""
     Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="session")
+def db_connection(db_engine):
+    """
+    Hold one connection inside an outer transaction for the whole test session
+    
+    Every session used by the tests nests a SAVEPOINT on this connection, so
+    nothing written by a test outlives the scope that wrote it.
+    """
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+def _savepoint_session(connection):
+    """Open a SAVEPOINT on the connection and a session that commits inside it"""
+    savepoint = connection.begin_nested()
+    db = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    return savepoint, db
+
+
+@pytest.fixture(scope="class")
+def db_session_class(db_connection):
+    """
+    Session whose commits stay visible to every test in the requesting class
+    
+    Use it for seed data shared by read-only tests; it is rolled back once the
+    class has finished.
+    """
+    savepoint, db = _savepoint_session(db_connection)
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
+        savepoint.rollback()
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
-    """Create a test client with database dependency override"""
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
-    
-    app.dependency_overrides[get_db] = override_get_db
+def db_session(db_connection):
+    """
+    Run each test inside a SAVEPOINT that is rolled back afterwards
+    
+    The session turns its own commits into nested SAVEPOINT releases, so tests
+    and the endpoints they call can commit freely without anything persisting
+    past the test.
+    """
+    savepoint, db = _savepoint_session(db_connection)
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        yield db
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        db.close()
+        savepoint.rollback()
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """Start the app (and its lifespan) once for the whole test session"""
     with TestClient(app) as test_client:
         yield test_client
-    app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def warm_app(app_client):
+    """Serve one request up front so first-request setup is not charged to a test"""
+    app_client.get("/")
+
+
+@pytest.fixture(scope="function")
+def client(app_client, db_session):
+    """Test client whose requests use the test's db_session"""
+    return app_client
+
+
+@pytest_asyncio.fixture
+async def async_client(db_session):
+    """
+    Async client that calls the app in-process on the test's event loop
+    
+    Requests skip TestClient's thread portal. ASGITransport does not send
+    lifespan events, which is fine here since db_engine already created the schema.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as test_client:
+        yield test_client
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the async Redis client"""
+    
+    def __init__(self):
+        self.store = {}
+    
+    async def get(self, key):
+        return self.store.get(key)
+    
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+    
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+    
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+    
+    async def hgetall(self, key):
+        return dict(self.store.get(key, {}))
+    
+    async def hset(self, key, mapping):
+        self.store.setdefault(key, {}).update(
+            {name.encode(): value if isinstance(value, bytes) else str(value).encode()
+             for name, value in mapping.items()}
+        )
+    
+    async def expire(self, key, ttl):
+        return key in self.store
+    
+    async def scan_iter(self, match="*"):
+        for key in list(self.store):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+
+@pytest.fixture(scope="function")
+def fake_redis():
+    """Enable the cache layer backed by an in-memory fake Redis"""
+    redis_client = FakeRedis()
+    with patch("app.cache.get_redis", return_value=redis_client):
+        yield redis_client
@@ -1,19 +1,12 @@
 import pytest
-from app.models import Repository
+from unittest.mock import patch
+from tests.conftest import INSERT_REPO, REPO_FIXTURES, make_repo
 
 
 def test_aggregate_metrics_basic(client, db_session):
     """Test basic aggregation across multiple repositories"""
-    # Add test repositories
-    repos = [
-        Repository(owner="facebook", repo="react", stars=200000, issues=500, language="JavaScript"),
-        Repository(owner="facebook", repo="react-native", stars=110000, issues=300, language="JavaScript"),
-        Repository(owner="microsoft", repo="vscode", stars=150000, issues=200, language="TypeScript"),
-    ]
-    
-    for repo in repos:
-        db_session.add(repo)
-    db_session.commit()
+    db_session.execute(INSERT_REPO, REPO_FIXTURES)
+    db_session.flush()
     
     response = client.get("/aggregate")
     
@@ -28,15 +21,8 @@ def test_aggregate_metrics_basic(client, db_session):
 
 def test_aggregate_with_owner_filter(client, db_session):
     """Test aggregation with owner filter"""
-    repos = [
-        Repository(owner="facebook", repo="react", stars=200000, issues=500, language="JavaScript"),
-        Repository(owner="facebook", repo="react-native", stars=110000, issues=300, language="JavaScript"),
-        Repository(owner="microsoft", repo="vscode", stars=150000, issues=200, language="TypeScript"),
-    ]
-    
-    for repo in repos:
-        db_session.add(repo)
-    db_session.commit()
+    db_session.execute(INSERT_REPO, REPO_FIXTURES)
+    db_session.flush()
     
     response = client.get("/aggregate?owner=facebook")
     
@@ -49,15 +35,8 @@ def test_aggregate_with_owner_filter(client, db_session):
 
 def test_aggregate_with_language_filter(client, db_session):
     """Test aggregation with language filter"""
-    repos = [
-        Repository(owner="facebook", repo="react", stars=200000, issues=500, language="JavaScript"),
-        Repository(owner="facebook", repo="react-native", stars=110000, issues=300, language="JavaScript"),
-        Repository(owner="microsoft", repo="vscode", stars=150000, issues=200, language="TypeScript"),
-    ]
-    
-    for repo in repos:
-        db_session.add(repo)
-    db_session.commit()
+    db_session.execute(INSERT_REPO, REPO_FIXTURES)
+    db_session.flush()
     
     response = client.get("/aggregate?language=JavaScript")
     
@@ -81,3 +60,24 @@ def test_aggregate_empty_database(client):
     assert data["by_language"] == {}
 
 
+def test_aggregate_cached_until_repository_written(client, db_session, fake_redis):
+    """Test that aggregates are served from cache and invalidated by write endpoints"""
+    db_session.execute(INSERT_REPO, REPO_FIXTURES[:1])
+    db_session.flush()
+    
+    first = client.get("/aggregate?owner=Facebook")
+    assert first.json()["total_stars"] == 200000
+    assert "agg:facebook:*" in fake_redis.store
+    
+    # Rows written behind the API's back are not seen while the result is cached
+    db_session.execute(INSERT_REPO, [make_repo("jest", stars=40000, issues=100, language="TypeScript")])
+    db_session.flush()
+    assert client.get("/aggregate?owner=facebook").json()["total_stars"] == 200000
+    
+    # A write through the API drops cached aggregates
+    with patch("app.routers.fetch.github_client.fetch_repository_metrics") as mock_fetch:
+        mock_fetch.return_value = {"owner": "facebook", "repo": "react", "stars": 210000, "issues": 500, "language": "JavaScript"}
+        client.post("/fetch/facebook/react")
+    
+    assert "agg:facebook:*" not in fake_redis.store
+    assert client.get("/aggregate?owner=facebook").json()["total_stars"] == 250000
@@ -1,5 +1,8 @@
 import pytest
-from unittest.mock import patch
+import asyncio
+import time
+import httpx
+from unittest.mock import AsyncMock, patch
 from app.services.github_client import GitHubClient
 from fastapi import HTTPException
 
@@ -37,8 +40,247 @@ async def test_github_client_handles_timeout():
             await client.get_repository("test", "repo")
         
         assert exc_info.value.status_code == 504
-        assert "timeout" in exc_info.value.detail.lower()
+        assert "timed out" in exc_info.value.detail.lower()
     
     await client.close()
 
 
+@pytest.mark.asyncio
+async def test_failed_counts_do_not_abort_metrics():
+    """Test that a failing count falls back while the other counts still succeed"""
+    client = GitHubClient()
+    
+    async def fake_count(owner, repo, kind, state):
+        if kind == "pr" and state == "closed":
+            raise HTTPException(status_code=403, detail="rate limit")
+        return 7
+    
+    mock_open_issues = AsyncMock(return_value=99)
+    with patch.object(client, "get_repository", new=AsyncMock(return_value={"stargazers_count": 3, "language": "Go"})), \
+         patch.object(client, "get_open_issues_count", new=mock_open_issues), \
+         patch.object(client, "_count", side_effect=fake_count):
+        metrics = await client.fetch_repository_metrics("test", "repo")
+    
+    # Open issues come from the detailed counts instead of a second count
+    mock_open_issues.assert_not_awaited()
+    assert metrics["stars"] == 3
+    assert metrics["issues"] == 7
+    assert metrics["issues_open"] == 7
+    assert metrics["issues_closed"] == 7
+    assert metrics["prs_open"] == 7
+    assert metrics["prs_closed"] == 0
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_metadata_cancels_pending_counts():
+    """Test that counts still in flight are cancelled when the repository fetch fails"""
+    client = GitHubClient()
+    cancelled = asyncio.Event()
+    
+    async def slow_counts(owner, repo):
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    async def missing_repository(owner, repo):
+        # Let the counts start before the metadata request fails
+        await asyncio.sleep(0)
+        raise HTTPException(status_code=404, detail=f"Repository '{owner}/{repo}' not found on GitHub")
+    
+    with patch.object(client, "get_repository", side_effect=missing_repository), \
+         patch.object(client, "get_issues_and_prs_counts", side_effect=slow_counts):
+        with pytest.raises(HTTPException) as exc_info:
+            await client.fetch_repository_metrics("test", "repo")
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+    
+    assert exc_info.value.status_code == 404
+    
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_fetches_share_one_request():
+    """Test that concurrent metric fetches for the same repository hit GitHub once"""
+    client = GitHubClient()
+    
+    async def slow_repository(owner, repo):
+        await asyncio.sleep(0.01)
+        return {"stargazers_count": 5, "language": "Rust"}
+    
+    mock_repository = AsyncMock(side_effect=slow_repository)
+    with patch.object(client, "get_repository", new=mock_repository), \
+         patch.object(client, "get_open_issues_count", new=AsyncMock(return_value=1)):
+        results = await asyncio.gather(*(
+            client.fetch_repository_metrics("test", "repo", include_detailed=False) for _ in range(5)
+        ))
+    
+    assert mock_repository.await_count == 1
+    assert all(result["stars"] == 5 for result in results)
+    assert not client._inflight
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_metrics_served_from_memory_and_revalidated_when_stale():
+    """Test that cached metrics are returned and refreshed in the background past half the TTL"""
+    client = GitHubClient()
+    
+    mock_repository = AsyncMock(side_effect=[
+        {"stargazers_count": 1, "language": "C"},
+        {"stargazers_count": 2, "language": "C"}
+    ])
+    with patch.object(client, "get_repository", new=mock_repository), \
+         patch.object(client, "get_open_issues_count", new=AsyncMock(return_value=0)):
+        first = await client.fetch_repository_metrics("test", "repo", include_detailed=False)
+        cached = await client.fetch_repository_metrics("test", "repo", include_detailed=False)
+        assert mock_repository.await_count == 1
+        assert cached == first
+        
+        # Age the entry past half the TTL: the stale value is served while refreshing
+        key = ("test", "repo", False)
+        fetched_at, result = client._metrics_cache[key]
+        client._metrics_cache[key] = (fetched_at - client.METRICS_CACHE_TTL, result)
+        stale = await client.fetch_repository_metrics("test", "repo", include_detailed=False)
+        assert stale["stars"] == 1
+        
+        await client._inflight[key]
+        fresh = await client.fetch_repository_metrics("test", "repo", include_detailed=False)
+        assert fresh["stars"] == 2
+        assert mock_repository.await_count == 2
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_metrics_cache_ignores_name_case_and_can_be_forgotten():
+    """Test that case variants share cached metrics until forget_metrics drops them"""
+    client = GitHubClient()
+    
+    mock_repository = AsyncMock(return_value={"stargazers_count": 1, "language": "C"})
+    with patch.object(client, "get_repository", new=mock_repository), \
+         patch.object(client, "get_open_issues_count", new=AsyncMock(return_value=0)):
+        await client.fetch_repository_metrics("Test", "Repo", include_detailed=False)
+        await client.fetch_repository_metrics("test", "repo", include_detailed=False)
+        assert mock_repository.await_count == 1
+        
+        client.forget_metrics("TEST", "repo")
+        await client.fetch_repository_metrics("test", "repo", include_detailed=False)
+        assert mock_repository.await_count == 2
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried_with_backoff():
+    """Test that network errors and 502s are retried before a page succeeds"""
+    client = GitHubClient()
+    request = httpx.Request("GET", "https://api.github.com/repos/test/repo/issues")
+    
+    with patch.object(client.client, "get") as mock_get, \
+         patch("app.services.github_client.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        mock_get.side_effect = [
+            httpx.ConnectError("reset", request=request),
+            httpx.Response(502, request=request),
+            httpx.Response(200, json=[{"id": 1}], request=request)
+        ]
+        count = await client.get_open_issues_count("test", "repo")
+    
+    assert count == 1
+    assert mock_get.call_count == 3
+    delays = [call.args[0] for call in mock_sleep.await_args_list]
+    assert 1 <= delays[0] < 2 and 2 <= delays[1] < 3
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_request_waits_for_reset():
+    """Test that a 403 with no requests remaining is retried after the reset time"""
+    client = GitHubClient()
+    request = httpx.Request("GET", "https://api.github.com/repos/test/repo")
+    reset = str(int(time.time()) + 5)
+    
+    with patch.object(client.client, "get") as mock_get, \
+         patch("app.services.github_client.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        mock_get.side_effect = [
+            httpx.Response(403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}, request=request),
+            httpx.Response(200, json={"stargazers_count": 1}, request=request)
+        ]
+        data = await client.get_repository("test", "repo")
+    
+    assert data == {"stargazers_count": 1}
+    assert 0 < mock_sleep.await_args.args[0] <= 7
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_low_rate_limit_budget_paces_requests():
+    """Test that requests are spaced out once few requests remain before the reset"""
+    client = GitHubClient()
+    reset = str(int(time.time()) + 100)
+    headers = {"X-RateLimit-Remaining": "10", "X-RateLimit-Limit": "5000", "X-RateLimit-Reset": reset}
+    request = httpx.Request("GET", "https://api.github.com/repos/test/repo/issues")
+    
+    with patch.object(client.client, "get", return_value=httpx.Response(200, json=[], headers=headers, request=request)), \
+         patch("app.services.github_client.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        for _ in range(3):
+            await client.get_open_issues_count("test", "repo")
+    
+    # The first request learns the budget and the second takes the next free slot;
+    # the third waits one interval (100s until reset / 10 requests left)
+    delays = [call.args[0] for call in mock_sleep.await_args_list]
+    assert len(delays) == 1
+    assert 8 < delays[0] <= 10
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_pacing_fails_fast_once_every_slot_is_taken():
+    """Test that requests beyond the paced budget fail instead of bursting out"""
+    client = GitHubClient()
+    reset = str(int(time.time()) + 100)
+    headers = {"X-RateLimit-Remaining": "1", "X-RateLimit-Limit": "5000", "X-RateLimit-Reset": reset}
+    request = httpx.Request("GET", "https://api.github.com/repos/test/repo/issues")
+    
+    with patch.object(client.client, "get", return_value=httpx.Response(200, json=[], headers=headers, request=request)) as mock_get, \
+         patch("app.services.github_client.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        # The first request learns the budget and the second takes its only slot
+        await client.get_open_issues_count("test", "repo")
+        await client.get_open_issues_count("test", "repo")
+        
+        # The next slot is 100s away, beyond MAX_RATE_LIMIT_WAIT
+        with pytest.raises(HTTPException) as exc_info:
+            await client.get_open_issues_count("test", "repo")
+    
+    assert exc_info.value.status_code == 403
+    assert mock_get.call_count == 2
+    mock_sleep.assert_not_awaited()
+    
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_rate_limited_search_falls_back_without_waiting():
+    """Test that an exhausted Search API budget falls back to listing at once"""
+    client = GitHubClient()
+    request = httpx.Request("GET", "https://api.github.com/search/issues")
+    reset = str(int(time.time()) + 30)
+    limited = httpx.Response(403, headers={
+        "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset, "X-RateLimit-Resource": "search"
+    }, request=request)
+    
+    with patch.object(client.client, "get", return_value=limited) as mock_get, \
+         patch("app.services.github_client.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        assert await client._search_count("test", "repo", "issue", "open") is None
+        # The exhausted budget is remembered, so the next search is not even sent
+        assert await client._search_count("test", "repo", "pr", "open") is None
+    
+    assert mock_get.call_count == 1
+    mock_sleep.assert_not_awaited()
+    
+    await client.close()
@@ -1,10 +1,16 @@
 import pytest
+from contextlib import nullcontext
 from unittest.mock import AsyncMock, patch
 from app.routers.fetch import fetch_repository
 from app.models import Repository
 from fastapi import HTTPException
 
 
+def without_on_conflict(enabled):
+    """Force the portable select-then-write upsert path when enabled"""
+    return patch("app.crud._dialect_insert", return_value=None) if enabled else nullcontext()
+
+
 @pytest.mark.asyncio
 async def test_fetch_repository_success(client, db_session):
     """Test successful repository fetch and storage"""
@@ -67,7 +73,8 @@ async def test_fetch_repository_invalid_input(client):
 
 
 @pytest.mark.asyncio
-async def test_fetch_repository_update_existing(client, db_session):
+@pytest.mark.parametrize("portable_upsert", [False, True])
+async def test_fetch_repository_update_existing(client, db_session, portable_upsert):
     """Test updating existing repository with new data"""
     # Create existing repo
     existing_repo = Repository(
@@ -80,7 +87,8 @@ async def test_fetch_repository_update_existing(client, db_session):
     db_session.add(existing_repo)
     db_session.commit()
     
-    with patch("app.routers.fetch.github_client.fetch_repository_metrics") as mock_fetch:
+    with patch("app.routers.fetch.github_client.fetch_repository_metrics") as mock_fetch, \
+            without_on_conflict(portable_upsert):
         mock_fetch.return_value = {
             "owner": "facebook",
             "repo": "react",
@@ -105,3 +113,59 @@ async def test_fetch_repository_update_existing(client, db_session):
         assert len(repos) == 1
 
 
+@pytest.mark.asyncio
+async def test_fetch_repository_uses_cached_metrics(client, db_session, fake_redis):
+    """Test that a cached GitHub response is reused instead of calling GitHub again"""
+    with patch("app.routers.fetch.github_client.fetch_repository_metrics") as mock_fetch:
+        mock_fetch.return_value = {
+            "owner": "facebook",
+            "repo": "react",
+            "stars": 200000,
+            "issues": 500,
+            "language": "JavaScript"
+        }
+        
+        first = client.post("/fetch/facebook/react")
+        second = client.post("/fetch/Facebook/React")
+        
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.json()["data"]["stars"] == 200000
+        assert mock_fetch.call_count == 1
+        assert "gh:repo:facebook:react" in fake_redis.store
+
+
+@pytest.mark.parametrize("portable_upsert", [False, True])
+def test_fetch_batch_stores_found_repositories(client, db_session, portable_upsert):
+    """Test that a batch fetch upserts found repositories and reports missing ones"""
+    db_session.add(Repository(owner="facebook", repo="react", stars=1, issues=0, language="JavaScript"))
+    db_session.commit()
+    
+    async def fake_batch(pairs):
+        assert pairs == [("facebook", "react"), ("octocat", "Hello-World"), ("octocat", "missing")]
+        return [
+            {"owner": "facebook", "repo": "react", "stars": 200000, "issues": 500, "language": "JavaScript",
+             "issues_open": 500, "issues_closed": 9000, "prs_open": 100, "prs_closed": 12000},
+            {"owner": "octocat", "repo": "Hello-World", "stars": 10, "issues": 1, "language": None,
+             "issues_open": 1, "issues_closed": 2, "prs_open": 0, "prs_closed": 3},
+            None
+        ]
+    
+    with patch("app.routers.fetch.github_client.fetch_metrics_batch", side_effect=fake_batch), \
+            without_on_conflict(portable_upsert):
+        response = client.post("/fetch/batch", json={"repos": [
+            {"owner": "facebook", "repo": "react"},
+            {"owner": "octocat", "repo": "Hello-World"},
+            {"owner": "Octocat", "repo": "hello-world"},
+            {"owner": "octocat", "repo": "missing"}
+        ]})
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["stored"] == 1
+    assert data["updated"] == 1
+    assert data["not_found"] == ["octocat/missing"]
+    
+    stored = {repo.repo: repo for repo in db_session.query(Repository).all()}
+    assert stored["react"].stars == 200000
+    assert stored["hello-world"].prs_closed == 3
@@ -0,0 +1,233 @@
+import pytest
+import httpx
+import orjson
+from unittest.mock import patch
+from app.services.github_client import GitHubClient
+
+
+def make_response(status_code, payload=None, headers=None):
+    """Build an httpx response for the repository endpoint"""
+    request = httpx.Request("GET", "https://api.github.com/repos/test/repo")
+    if payload is None:
+        return httpx.Response(status_code, headers=headers or {}, request=request)
+    return httpx.Response(status_code, json=payload, headers=headers or {}, request=request)
+
+
+@pytest.mark.asyncio
+async def test_get_repository_revalidates_with_etag(fake_redis):
+    """Test that a stored ETag is sent and a 304 reuses the cached body"""
+    client = GitHubClient()
+    payload = {"stargazers_count": 42, "language": "Python"}
+    
+    with patch.object(client.client, "get") as mock_get:
+        mock_get.side_effect = [
+            make_response(200, payload, {"ETag": '"abc123"'}),
+            make_response(304)
+        ]
+        
+        first = await client.get_repository("test", "repo")
+        second = await client.get_repository("test", "repo")
+        
+        assert first == payload
+        assert second == payload
+        assert mock_get.call_args_list[0].kwargs["headers"] is None
+        assert mock_get.call_args_list[1].kwargs["headers"] == {"If-None-Match": '"abc123"'}
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_list_pages_revalidate_with_in_process_etag():
+    """Test that unchanged issue pages are answered from the in-process ETag cache"""
+    client = GitHubClient()
+    issues = [{"id": 1}, {"id": 2, "pull_request": {}}, {"id": 3}]
+    
+    with patch.object(client.client, "get") as mock_get:
+        mock_get.side_effect = [
+            make_response(200, issues, {"ETag": 'W/"page1"'}),
+            make_response(304, headers={"X-RateLimit-Remaining": "4999"})
+        ]
+        
+        assert await client.get_open_issues_count("test", "repo") == 2
+        assert await client.get_open_issues_count("test", "repo") == 2
+        assert mock_get.call_args_list[1].kwargs["headers"] == {"If-None-Match": 'W/"page1"'}
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_in_process_etag_cache_is_bounded_by_body_size():
+    """Test that cached page bodies are evicted once their total size exceeds the budget"""
+    with patch.object(GitHubClient, "ETAG_CACHE_BYTES", 10):
+        client = GitHubClient()
+    headers = httpx.Headers()
+    
+    client._remember_etag(("/a", frozenset()), ('"a"', b"123456", headers))
+    client._remember_etag(("/b", frozenset()), ('"b"', b"1234", headers))
+    client._remember_etag(("/c", frozenset()), ('"c"', b"12", headers))
+    client._remember_etag(("/d", frozenset()), ('"d"', b"x" * 11, headers))
+    
+    assert set(client._etag_cache) == {("/b", frozenset()), ("/c", frozenset())}
+    assert client._etag_cache.currsize == 6
+    
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_metrics_use_graphql_when_authenticated():
+    """Test that an authenticated client fetches all metrics in one GraphQL request"""
+    client = GitHubClient()
+    client.headers["Authorization"] = "token test"
+    repository = {
+        "stargazerCount": 99,
+        "primaryLanguage": {"name": "Rust"},
+        "issues_open": {"totalCount": 4},
+        "issues_closed": {"totalCount": 10},
+        "prs_open": {"totalCount": 2},
+        "prs_closed": {"totalCount": 30}
+    }
+    
+    with patch.object(client.client, "post") as mock_post, patch.object(client, "get_repository") as mock_rest:
+        mock_post.return_value = make_response(200, {"data": {"repository": repository}})
+        metrics = await client.fetch_repository_metrics("test", "repo")
+        
+        assert metrics == {
+            "owner": "test", "repo": "repo", "stars": 99, "issues": 4, "language": "Rust",
+            "issues_open": 4, "issues_closed": 10, "prs_open": 2, "prs_closed": 30
+        }
+        assert mock_post.call_count == 1
+        mock_rest.assert_not_called()
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_metrics_fall_back_to_rest_when_graphql_rejected():
+    """Test that a 4xx GraphQL response falls back to the REST endpoints"""
+    client = GitHubClient()
+    client.headers["Authorization"] = "token expired"
+    
+    with patch.object(client.client, "post", return_value=make_response(401, {"message": "Bad credentials"})), \
+         patch.object(client, "get_repository", return_value={"stargazers_count": 1, "language": "C"}), \
+         patch.object(client, "get_open_issues_count", return_value=3):
+        metrics = await client.fetch_repository_metrics("test", "repo", include_detailed=False)
+    
+    assert metrics == {"owner": "test", "repo": "repo", "stars": 1, "issues": 3, "language": "C"}
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_metrics_batch_uses_aliased_graphql_query():
+    """Test that batched metrics are requested per alias with names passed as variables"""
+    client = GitHubClient()
+    client.headers["Authorization"] = "token test"
+    repository = {
+        "stargazerCount": 5,
+        "primaryLanguage": None,
+        "issues_open": {"totalCount": 1},
+        "issues_closed": {"totalCount": 2},
+        "prs_open": {"totalCount": 3},
+        "prs_closed": {"totalCount": 4}
+    }
+    
+    with patch.object(client.client, "post") as mock_post, patch.object(client, "GRAPHQL_BATCH_SIZE", 2):
+        mock_post.side_effect = [
+            make_response(200, {"data": {"r0": repository, "r1": None}, "errors": [{"type": "NOT_FOUND", "path": ["r1"]}]}),
+            make_response(200, {"data": {"r0": repository}})
+        ]
+        results = await client.fetch_metrics_batch([("a", "one"), ("a", "gone"), ("b", 'x") { id }')])
+        
+        assert [result and result["repo"] for result in results] == ["one", None, 'x") { id }']
+        assert results[0]["prs_closed"] == 4
+        body = orjson.loads(mock_post.call_args_list[1].kwargs["content"])
+        assert body["variables"] == {"o0": "b", "r0": 'x") { id }'}
+        assert 'x")' not in body["query"]
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_metrics_batch_refetches_aliases_failing_for_other_reasons():
+    """Test that only NOT_FOUND aliases count as missing; other failures are fetched individually"""
+    client = GitHubClient()
+    client.headers["Authorization"] = "token test"
+    batch = {
+        "data": {"r0": None, "r1": None},
+        "errors": [
+            {"type": "NOT_FOUND", "path": ["r0"]},
+            {"type": "RATE_LIMITED", "path": ["r1"]}
+        ]
+    }
+    metrics = {"owner": "a", "repo": "busy", "stars": 1, "issues": 0, "language": None}
+    
+    with patch.object(client.client, "post", return_value=make_response(200, batch)), \
+         patch.object(client, "fetch_repository_metrics", return_value=metrics) as mock_fetch:
+        results = await client.fetch_metrics_batch([("a", "gone"), ("a", "busy")])
+    
+    assert results == [None, metrics]
+    mock_fetch.assert_called_once_with("a", "busy", include_detailed=True)
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_graphql_requests_are_retried_like_rest():
+    """Test that GraphQL requests go through the same transient-failure retries"""
+    client = GitHubClient()
+    repository = {"stargazerCount": 1, "primaryLanguage": None}
+    for key in ("issues_open", "issues_closed", "prs_open", "prs_closed"):
+        repository[key] = {"totalCount": 0}
+    
+    with patch.object(client.client, "post") as mock_post, patch.object(client, "_backoff", return_value=0):
+        mock_post.side_effect = [make_response(502), make_response(200, {"data": {"repository": repository}})]
+        metrics = await client.fetch_metrics_graphql("test", "repo")
+    
+    assert metrics["stars"] == 1
+    assert mock_post.call_count == 2
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_list_page_etags_shared_through_redis(fake_redis):
+    """Test that a page ETag stored by one client is revalidated by another"""
+    issues = [{"id": 1}, {"id": 2}]
+    link = '<https://api.github.com/repositories/1/issues?state=open&per_page=100&page=1>; rel="last"'
+    first, second = GitHubClient(), GitHubClient()
+    
+    with patch.object(first.client, "get", return_value=make_response(200, issues, {"ETag": '"p1"', "Link": link})):
+        assert await first.get_open_issues_count("test", "repo") == 2
+    
+    # Only what the count reads is shared, not the issue objects
+    assert [entry[b"body"] for entry in fake_redis.store.values()] == [b"[{},{}]"]
+    
+    with patch.object(second.client, "get", return_value=make_response(304)) as mock_get:
+        assert await second.get_open_issues_count("test", "repo") == 2
+        assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"p1"'}
+    
+    await first.close()
+    await second.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_owner_pages_keep_only_repository_row_fields(fake_redis):
+    """Test that owner pages revalidated from Redis still yield complete RepoRows"""
+    repos = [{
+        "name": "repo", "full_name": "test/repo", "owner": {"login": "test", "avatar_url": "x"},
+        "stargazers_count": 5, "language": "Python", "html_url": "https://github.com/test/repo",
+        "node_id": "R_1", "topics": ["a", "b"]
+    }]
+    first, second = GitHubClient(), GitHubClient()
+    
+    with patch.object(first.client, "get", return_value=make_response(200, repos, {"ETag": '"o1"'})):
+        fresh = [row async for row in first.get_owner_repositories("test")]
+    
+    with patch.object(second.client, "get", return_value=make_response(304)):
+        revalidated = [row async for row in second.get_owner_repositories("test")]
+    
+    assert revalidated == fresh
+    body = orjson.loads(next(iter(fake_redis.store.values()))[b"body"])
+    assert "node_id" not in body[0] and body[0]["owner"] == {"login": "test"}
+    
+    await first.close()
+    await second.close()
@@ -0,0 +1,47 @@
+import pytest
+from unittest.mock import patch
+from app.models import Repository
+
+
+DETAILED_METRICS = {
+    "owner": "facebook",
+    "repo": "react",
+    "stars": 200000,
+    "issues": 500,
+    "language": "JavaScript",
+    "issues_open": 500,
+    "issues_closed": 9000,
+    "prs_open": 150,
+    "prs_closed": 12000
+}
+
+
+def test_github_details_store_upserts_repository(client, db_session):
+    """Test that store=true inserts once and updates on subsequent calls"""
+    with patch("app.routers.github_details.github_client.fetch_repository_metrics") as mock_fetch:
+        mock_fetch.return_value = DETAILED_METRICS
+        first = client.get("/github/facebook/react/details?store=true")
+        
+        mock_fetch.return_value = {**DETAILED_METRICS, "stars": 210000, "prs_closed": 12500}
+        second = client.get("/github/Facebook/React/details?store=true")
+    
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.json()["total_prs"] == 12650
+    
+    repos = db_session.query(Repository).all()
+    assert len(repos) == 1
+    assert repos[0].owner == "facebook"
+    assert repos[0].stars == 210000
+    assert repos[0].prs_closed == 12500
+
+
+def test_github_details_without_store(client, db_session):
+    """Test that details are returned without touching the database by default"""
+    with patch("app.routers.github_details.github_client.fetch_repository_metrics") as mock_fetch:
+        mock_fetch.return_value = DETAILED_METRICS
+        response = client.get("/github/facebook/react/details")
+    
+    assert response.status_code == 200
+    assert response.json()["total_issues"] == 9500
+    assert db_session.query(Repository).count() == 0
@@ -0,0 +1,95 @@
+import pytest
+from unittest.mock import patch
+from app.models import Repository
+from app.services.github_client import GitHubClient
+from fastapi import HTTPException
+
+
+def make_github_repos(names):
+    """Build repository rows shaped like GitHubClient.get_owner_repositories output"""
+    return [
+        GitHubClient._extract_repo_row({
+            "name": name,
+            "full_name": f"octocat/{name}",
+            "owner": {"login": "octocat"},
+            "stargazers_count": 10 * (i + 1),
+            "open_issues_count": i,
+            "language": "Python"
+        })
+        for i, name in enumerate(names)
+    ]
+
+
+def stream(rows):
+    """Replace get_owner_repositories with an async generator over rows"""
+    async def fake_get_owner_repositories(owner, limit=None):
+        for row in rows:
+            yield row
+    return fake_get_owner_repositories
+
+
+def test_owner_repositories_stores_new_and_updates_existing(client, db_session):
+    """Test that owner repositories are inserted or updated in bulk"""
+    db_session.add(Repository(owner="octocat", repo="hello-world", stars=1, issues=0, language="C"))
+    db_session.commit()
+    
+    repos_data = make_github_repos(["Hello-World", "Spoon-Knife", "linguist"])
+    with patch("app.routers.owner.github_client.get_owner_repositories", new=stream(repos_data)):
+        response = client.get("/owner/octocat/repos")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert data["stored"] == 2
+    assert data["updated"] == 1
+    
+    stored = {repo.repo: repo for repo in db_session.query(Repository).all()}
+    assert set(stored) == {"hello-world", "spoon-knife", "linguist"}
+    assert stored["hello-world"].stars == 10
+    assert stored["hello-world"].language == "Python"
+
+
+def test_owner_repositories_store_evicts_in_memory_metrics(client, db_session):
+    """Test that storing owner repositories drops their in-process cached metrics"""
+    repos_data = make_github_repos(["Hello-World"])
+    with patch("app.routers.owner.github_client.get_owner_repositories", new=stream(repos_data)), \
+         patch("app.routers.owner.github_client.forget_metrics") as mock_forget:
+        response = client.get("/owner/octocat/repos")
+    
+    assert response.status_code == 200
+    mock_forget.assert_called_once_with("octocat", "hello-world")
+
+
+def test_owner_repositories_without_store(client, db_session):
+    """Test that store=false leaves the database untouched"""
+    repos_data = make_github_repos(["Hello-World"])
+    with patch("app.routers.owner.github_client.get_owner_repositories", new=stream(repos_data)):
+        response = client.get("/owner/octocat/repos?store=false")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["stored"] is None
+    assert data["updated"] is None
+    assert db_session.query(Repository).count() == 0
+
+
+def test_owner_repositories_detailed_counts(client, db_session):
+    """Test that detailed=true stores per-repository issue/PR counts"""
+    repos_data = make_github_repos(["Hello-World", "Spoon-Knife"])
+    
+    async def fake_metrics(owner, repo, include_detailed=True):
+        if repo == "Spoon-Knife":
+            raise HTTPException(status_code=404, detail="not found")
+        return {"owner": owner, "repo": repo, "stars": 10, "issues": 4, "language": "Python",
+                "issues_open": 4, "issues_closed": 6, "prs_open": 1, "prs_closed": 2}
+    
+    with patch("app.routers.owner.github_client.get_owner_repositories", new=stream(repos_data)), \
+         patch("app.routers.owner.github_client.fetch_repository_metrics", side_effect=fake_metrics):
+        response = client.get("/owner/octocat/repos?detailed=true")
+    
+    assert response.status_code == 200
+    stored = {repo.repo: repo for repo in db_session.query(Repository).all()}
+    assert stored["hello-world"].issues_closed == 6
+    assert stored["hello-world"].prs_closed == 2
+    # Repositories whose detail fetch failed are still stored with basic info
+    assert stored["spoon-knife"].stars == 20
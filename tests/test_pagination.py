@@ -1,9 +1,16 @@
 import pytest
+import httpx
 from unittest.mock import AsyncMock, patch
 from app.services.github_client import GitHubClient
 from fastapi import HTTPException
 
 
+def make_response(payload, headers=None):
+    """Build an httpx response carrying a JSON payload"""
+    request = httpx.Request("GET", "https://api.github.com/")
+    return httpx.Response(200, json=payload, headers=headers or {}, request=request)
+
+
 @pytest.mark.asyncio
 async def test_pagination_handles_multiple_pages():
     """Test that pagination correctly handles multiple pages of issues"""
@@ -18,20 +25,11 @@ async def test_pagination_handles_multiple_pages():
     ]
     
     with patch.object(client.client, "get") as mock_get:
-        # Setup mock responses
+        # Setup mock responses; GitHub links the next page until the last one
+        next_link = '<https://api.github.com/repositories/1/issues?state=open&per_page=100&page=2>; rel="next"'
         mock_get.side_effect = [
-            type("Response", (), {
-                "status_code": 200,
-                "json": lambda: mock_responses[0],
-                "headers": {},
-                "raise_for_status": lambda: None
-            })(),
-            type("Response", (), {
-                "status_code": 200,
-                "json": lambda: mock_responses[1],
-                "headers": {},
-                "raise_for_status": lambda: None
-            })()
+            make_response(mock_responses[0], {"Link": next_link}),
+            make_response(mock_responses[1])
         ]
         
         count = await client.get_open_issues_count("test", "repo")
@@ -54,12 +52,7 @@ async def test_pagination_filters_pull_requests():
     ]
     
     with patch.object(client.client, "get") as mock_get:
-        mock_get.return_value = type("Response", (), {
-            "status_code": 200,
-            "json": lambda: mock_response,
-            "headers": {},
-            "raise_for_status": lambda: None
-        })()
+        mock_get.return_value = make_response(mock_response)
         
         count = await client.get_open_issues_count("test", "repo")
         assert count == 2  # Only 2 real issues, PRs filtered out
@@ -67,3 +60,106 @@ async def test_pagination_filters_pull_requests():
     await client.close()
 
 
+@pytest.mark.asyncio
+async def test_owner_repositories_fetches_remaining_pages_concurrently():
+    """Test that pages listed in the Link header are all fetched and combined in order"""
+    client = GitHubClient()
+    link = '<https://api.github.com/user/1/repos?per_page=100&page=2>; rel="next", ' \
+           '<https://api.github.com/user/1/repos?per_page=100&page=3>; rel="last"'
+    
+    async def fake_get(url, params=None, **kwargs):
+        page = params["page"]
+        size = 100 if page < 3 else 20
+        repos = [{"name": f"repo-{page}-{i}", "owner": {"login": "test"}} for i in range(size)]
+        return make_response(repos, {"Link": link})
+    
+    with patch.object(client.client, "get", side_effect=fake_get) as mock_get:
+        repos = [repo async for repo in client.get_owner_repositories("test")]
+        
+        assert len(repos) == 220
+        assert repos[0].name == "repo-1-0"
+        assert repos[-1].name == "repo-3-19"
+        assert mock_get.call_count == 3
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_owner_repositories_limit_skips_unneeded_pages():
+    """Test that a limit stops page requests beyond the pages it needs"""
+    client = GitHubClient()
+    link = '<https://api.github.com/user/1/repos?per_page=100&page=10>; rel="last"'
+    
+    async def fake_get(url, params=None, **kwargs):
+        repos = [{"name": f"repo-{params['page']}-{i}", "owner": {"login": "test"}} for i in range(100)]
+        return make_response(repos, {"Link": link})
+    
+    with patch.object(client.client, "get", side_effect=fake_get) as mock_get:
+        repos = [repo async for repo in client.get_owner_repositories("test", limit=150)]
+        
+        assert len(repos) == 150
+        assert mock_get.call_count == 2
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_pagination_fetches_issue_pages_from_link_header():
+    """Test that issue counts fetch the pages listed in the Link header and filter PRs"""
+    client = GitHubClient()
+    link = '<https://api.github.com/repositories/1/issues?state=open&per_page=100&page=4>; rel="last"'
+    
+    async def fake_get(url, params=None, **kwargs):
+        page = params["page"]
+        # Every page carries one pull request; the last page is partial
+        size = 100 if page < 4 else 10
+        items = [{"id": i} for i in range(size - 1)] + [{"id": -1, "pull_request": {}}]
+        return make_response(items, {"Link": link})
+    
+    with patch.object(client.client, "get", side_effect=fake_get) as mock_get:
+        count = await client.get_open_issues_count("test", "repo")
+        
+        assert count == 99 * 3 + 9
+        assert sorted(call.kwargs["params"]["page"] for call in mock_get.call_args_list) == [1, 2, 3, 4]
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_detailed_counts_use_search_and_fall_back_to_pagination():
+    """Test that counts come from search total_count, paginating only when search is rejected"""
+    client = GitHubClient()
+    
+    async def fake_get(url, params=None, **kwargs):
+        if url == "/search/issues":
+            if "is:pr is:closed" in params["q"]:
+                return httpx.Response(422, request=httpx.Request("GET", url))
+            return make_response({"total_count": 42, "incomplete_results": False, "items": []})
+        return make_response([{"id": 1}, {"id": 2}])
+    
+    with patch.object(client.client, "get", side_effect=fake_get) as mock_get:
+        counts = await client.get_issues_and_prs_counts("test", "repo")
+        
+        assert counts == {"issues_open": 42, "issues_closed": 42, "prs_open": 42, "prs_closed": 2}
+        assert mock_get.call_args_list[-1].args[0] == "/repos/test/repo/pulls"
+    
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_count_items_reads_totals_from_link_header():
+    """Test that counts come from the rel="last" page of one-item pages, minus PRs for issues"""
+    client = GitHubClient()
+    totals = {"/repos/test/repo/issues": 160, "/repos/test/repo/pulls": 40}
+    
+    async def fake_get(url, params=None, **kwargs):
+        assert params["per_page"] == 1
+        link = f'<https://api.github.com/repositories/1/x?state=closed&per_page=1&page={totals[url]}>; rel="last"'
+        return make_response([{"id": 1}], {"Link": link})
+    
+    with patch.object(client.client, "get", side_effect=fake_get) as mock_get:
+        assert await client._count_items("/repos/test/repo/issues", "closed", is_pr=False) == 120
+        assert await client._count_items("/repos/test/repo/pulls", "closed", is_pr=True) == 40
+        assert mock_get.call_count == 3
+    
+    await client.close()
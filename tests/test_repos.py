@@ -1,81 +1,171 @@
+import orjson
 import pytest
-from app.models import Repository
+from unittest.mock import patch
+from tests.conftest import INSERT_REPO, REPO_FIXTURES, make_repo
+from app.database import data_version
+from sqlalchemy import select
+from app.routers.repos import COLUMNS, fetch_repositories, stream_repositories
+from app.schemas import RepositoryResponse
 
 
-def test_list_repositories_basic(client, db_session):
-    """Test listing all repositories"""
-    repos = [
-        Repository(owner="facebook", repo="react", stars=200000, issues=500, language="JavaScript"),
-        Repository(owner="microsoft", repo="vscode", stars=150000, issues=200, language="TypeScript"),
+def parse(response):
+    """Decode a response body with orjson instead of the stdlib json module"""
+    return orjson.loads(response.content)
+
+
+class TestSeededRepositories:
+    """Listing tests that share one insert of REPO_FIXTURES"""
+    
+    @pytest.fixture(scope="class", autouse=True)
+    def seeded_repos(self, db_session_class):
+        """Insert the fixture repositories once for every test in the class"""
+        db_session_class.execute(INSERT_REPO, REPO_FIXTURES)
+        db_session_class.flush()
+        return REPO_FIXTURES
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("query,expected_total,field,value", [
+        ("", 3, None, None),
+        ("?owner=facebook", 2, "owner", "facebook"),
+        ("?language=JavaScript", 2, "language", "JavaScript"),
+        ("?limit=2", 2, None, None),
+    ])
+    async def test_list_repositories(self, async_client, query, expected_total, field, value):
+        """Test listing repositories with each supported filter"""
+        response = await async_client.get(f"/repos{query}")
+        
+        assert response.status_code == 200
+        data = parse(response)
+        assert data["total"] == expected_total
+        assert len(data["repos"]) == expected_total
+        if field:
+            assert all(repo[field] == value for repo in data["repos"])
+
+
+@pytest.mark.asyncio
+async def test_list_repositories_with_limit(async_client, db_session):
+    """Test listing repositories with limit parameter"""
+    rows = [
+        make_repo(f"repo{i}", stars=1000, issues=10)
+        for i in range(5)
     ]
     
-    for repo in repos:
-        db_session.add(repo)
-    db_session.commit()
+    db_session.execute(INSERT_REPO, rows)
+    db_session.flush()
     
-    response = client.get("/repos")
+    response = await async_client.get("/repos?limit=3")
     
     assert response.status_code == 200
-    data = response.json()
-    assert data["total"] == 2
-    assert len(data["repos"]) == 2
+    data = parse(response)
+    assert data["total"] == 3
+    assert len(data["repos"]) == 3
+    assert data["next_cursor"] == data["repos"][-1]["id"]
+    
+    response = await async_client.get(f"/repos?limit=3&after_id={data['next_cursor']}")
+    
+    assert response.status_code == 200
+    page = parse(response)
+    assert [repo["repo"] for repo in page["repos"]] == ["repo3", "repo4"]
+    assert page["next_cursor"] is None
 
 
-def test_list_repositories_with_owner_filter(client, db_session):
-    """Test listing repositories filtered by owner"""
-    repos = [
-        Repository(owner="facebook", repo="react", stars=200000, issues=500, language="JavaScript"),
-        Repository(owner="facebook", repo="react-native", stars=110000, issues=300, language="JavaScript"),
-        Repository(owner="microsoft", repo="vscode", stars=150000, issues=200, language="TypeScript"),
-    ]
+@pytest.mark.asyncio
+async def test_limited_listing_cached_until_rows_change(async_client, db_session):
+    """Test that identical limited listings reuse the encoded result until a write"""
+    db_session.execute(INSERT_REPO, REPO_FIXTURES[:1])
+    db_session.flush()
+    
+    with patch("app.routers.repos.fetch_repositories", wraps=fetch_repositories) as mock_fetch:
+        first = await async_client.get("/repos?limit=5")
+        second = await async_client.get("/repos?limit=5")
+        assert mock_fetch.call_count == 1
+        assert parse(second) == parse(first)
+        
+        db_session.execute(INSERT_REPO, REPO_FIXTURES[1:2])
+        version = data_version()
+        db_session.flush()
+        # Flushed rows are not visible to other sessions yet, so cached pages stay valid
+        assert data_version() == version
+        db_session.commit()
+        third = await async_client.get("/repos?limit=5")
+    
+    assert mock_fetch.call_count == 2
+    assert parse(third)["total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_limited_listing_not_cached_when_disabled(async_client, db_session):
+    """Test that every limited listing queries the database without REPO_QUERY_CACHE_TTL"""
+    db_session.execute(INSERT_REPO, REPO_FIXTURES[:1])
+    db_session.flush()
     
-    for repo in repos:
-        db_session.add(repo)
-    db_session.commit()
+    with patch("app.routers.repos._query_cache", None), \
+         patch("app.routers.repos.fetch_repositories", wraps=fetch_repositories) as mock_fetch:
+        await async_client.get("/repos?limit=5")
+        await async_client.get("/repos?limit=5")
+    
+    assert mock_fetch.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_listed_repositories_match_response_schema(async_client, db_session):
+    """Test that rows serialized without a model still have the RepositoryResponse shape"""
+    db_session.execute(INSERT_REPO, REPO_FIXTURES[:1])
+    db_session.flush()
     
-    response = client.get("/repos?owner=facebook")
+    item = parse(await async_client.get("/repos?limit=1"))["repos"][0]
     
-    assert response.status_code == 200
-    data = response.json()
-    assert data["total"] == 2
-    assert all(repo["owner"] == "facebook" for repo in data["repos"])
+    assert RepositoryResponse.model_validate(item).model_dump(mode="json") == item
 
 
-def test_list_repositories_with_language_filter(client, db_session):
-    """Test listing repositories filtered by language"""
-    repos = [
-        Repository(owner="facebook", repo="react", stars=200000, issues=500, language="JavaScript"),
-        Repository(owner="microsoft", repo="vscode", stars=150000, issues=200, language="TypeScript"),
+@pytest.mark.asyncio
+async def test_list_repositories_streams_in_batches(async_client, db_session):
+    """Test that unbounded listings are streamed across several database batches"""
+    rows = [
+        make_repo(f"repo{i}", stars=i)
+        for i in range(5)
     ]
     
-    for repo in repos:
-        db_session.add(repo)
-    db_session.commit()
+    db_session.execute(INSERT_REPO, rows)
+    db_session.flush()
     
-    response = client.get("/repos?language=JavaScript")
+    with patch("app.routers.repos.YIELD_PER", 2):
+        response = await async_client.get("/repos")
     
     assert response.status_code == 200
-    data = response.json()
-    assert data["total"] == 1
-    assert data["repos"][0]["language"] == "JavaScript"
+    data = parse(response)
+    assert data["total"] == 5
+    assert sorted(repo["repo"] for repo in data["repos"]) == [f"repo{i}" for i in range(5)]
+    assert data["next_cursor"] is None
 
 
-def test_list_repositories_with_limit(client, db_session):
-    """Test listing repositories with limit parameter"""
-    repos = [
-        Repository(owner="facebook", repo=f"repo{i}", stars=1000, issues=10, language="JavaScript")
-        for i in range(5)
-    ]
+def test_streamed_listing_opens_its_own_session(db_session):
+    """Test that the streamed body does not depend on the endpoint's session staying open"""
+    db_session.execute(INSERT_REPO, REPO_FIXTURES[:2])
+    db_session.flush()
+    bind = db_session.get_bind()
     
-    for repo in repos:
-        db_session.add(repo)
-    db_session.commit()
+    with patch.object(db_session, "execute", side_effect=AssertionError("request session used")):
+        body = b"".join(stream_repositories(bind, select(*COLUMNS)))
     
-    response = client.get("/repos?limit=3")
+    assert orjson.loads(body)["total"] == 2
+
+@pytest.mark.asyncio
+async def test_list_repositories_empty(async_client):
+    """Test listing repositories with an empty database"""
+    response = await async_client.get("/repos")
     
     assert response.status_code == 200
-    data = response.json()
-    assert data["total"] == 3
-    assert len(data["repos"]) == 3
+    assert parse(response) == {"repos": [], "total": 0, "next_cursor": None}
 
 
+@pytest.mark.asyncio
+async def test_list_repositories_owner_filter_is_case_insensitive(async_client, db_session):
+    """Test that the owner filter matches regardless of how the owner was stored"""
+    db_session.execute(INSERT_REPO, [dict(REPO_FIXTURES[0], owner="Facebook")])
+    db_session.flush()
+    
+    response = await async_client.get("/repos?owner=FACEBOOK&limit=10")
+    
+    assert response.status_code == 200
+    assert parse(response)["total"] == 1